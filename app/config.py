@@ -1,5 +1,7 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from pathlib import Path
 
 
 class Settings(BaseSettings):
@@ -8,12 +10,94 @@ class Settings(BaseSettings):
     slack_signing_secret: str
     slack_manager_user_id: str
     
+    # Slack HTTP client
+    # Pointed at benchmarks.fake_slack for load tests
+    slack_api_base_url: str = "https://www.slack.com/api/"
+    slack_http_timeout: int = 10
+    slack_http_connect_timeout: float = 3.0
+    slack_http_pool_size: int = 100
+    slack_http_keepalive_timeout: float = 30.0
+    slack_file_lookup_concurrency: int = 5
+    slack_file_cache_size: int = 2000
+    slack_file_cache_ttl: int = 3600
+    slack_user_cache_size: int = 5000
+    slack_user_cache_ttl: int = 3600
+    slack_dm_channel_ttl: int = 86400
+    slack_warm_user_cache: bool = True
+    
+    # Slack rate limiting and retries
+    slack_max_retries: int = 3
+    slack_retry_base_delay: float = 1.0
+    slack_retry_max_delay: float = 30.0
+    slack_post_message_per_minute: int = 300
+    slack_post_message_burst: int = 20
+    
+    # Signed export links
+    public_base_url: str = "http://localhost:8000"
+    export_signing_secret: str = ""
+    export_link_ttl: int = 900
+    
     # Database
     database_url: str
+    # Serve request-path queries through an asyncpg AsyncSession instead of psycopg2
+    db_async: bool = False
+    async_database_url: str = ""
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    
+    # Scheduler leader election across app processes
+    scheduler_leader_poll: float = 15.0
+    scheduler_catchup_window: int = 6 * 3600
+    scheduler_stale_run_after: int = 3600
+    
+    # Monthly partitions of timesheet_entries; retention 0 keeps every month online.
+    # Archived months are dropped from the database, so with retention on the archive
+    # directory must be an absolute path on durable storage (a mounted volume).
+    partition_premake_months: int = 3
+    partition_retention_months: int = 0
+    partition_archive_dir: str = ""
+    
+    # Health probes
+    health_cache_ttl: float = 5.0
+    health_db_timeout: float = 2.0
+    ready_pool_saturation: float = 0.9
     
     # Application
     app_env: str = "development"
     log_level: str = "INFO"
+    report_page_size: int = 10
+    
+    # Rendered report cache; "postgres" shares invalidations between workers via LISTEN/NOTIFY
+    report_cache_backend: str = "memory"
+    report_cache_size: int = 500
+    report_cache_ttl: int = 300
+    
+    # Acknowledge submissions immediately and finish them in the background
+    interaction_ack_first: bool = False
+    background_workers: int = 4
+    background_queue_size: int = 1000
+    
+    # Outbox drain workers for outbound Slack messages
+    outbox_workers: int = 2
+    outbox_batch_size: int = 20
+    outbox_poll_interval: float = 0.5
+    outbox_lease_seconds: int = 60
+    outbox_max_attempts: int = 8
+    outbox_retry_base_delay: float = 2.0
+    outbox_retry_max_delay: float = 600.0
+    
+    # Duplicate Slack deliveries and double-clicks
+    idempotency_cache_size: int = 10000
+    idempotency_ttl: int = 3600
+    
+    @model_validator(mode="after")
+    def _check_archive_dir(self):
+        if self.partition_retention_months > 0 and not Path(self.partition_archive_dir).is_absolute():
+            raise ValueError(
+                "PARTITION_ARCHIVE_DIR must be an absolute path on durable storage "
+                "when PARTITION_RETENTION_MONTHS is set"
+            )
+        return self
     
     class Config:
         env_file = ".env"
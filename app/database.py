@@ -1,16 +1,54 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import get_settings
+from app.utils.metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, track_pool
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Union
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+engine = create_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow
+)
+track_pool(engine, 'sync')
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Request-path sessions are either sync (psycopg2) or async (asyncpg), chosen by DB_ASYNC
+DBSession = Union[Session, AsyncSession]
 
-def get_db():
+
+def _async_database_url(url: str) -> str:
+    if settings.async_database_url:
+        return settings.async_database_url
+    scheme, rest = url.split("://", 1)
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgres") else url
+
+
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    pool_pre_ping=True,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow
+) if settings.db_async else None
+if async_engine is not None:
+    track_pool(async_engine.sync_engine, 'async')
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+) if settings.db_async else None
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
@@ -18,5 +56,40 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if settings.db_async else get_sync_db
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[DBSession]:
+    # For work outside a request (background tasks) that should follow DB_ASYNC as well
+    if settings.db_async:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+async def run_db(db: DBSession, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    # Runs sync service code against either session type; AsyncSession drives it over asyncpg
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func, *args, **kwargs)
+    return func(db, *args, **kwargs)
+
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    # Schema changes are applied by Alembic migrations rather than create_all
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).parent / "migrations"))
+    command.upgrade(config, "head")
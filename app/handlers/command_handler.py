@@ -1,11 +1,14 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.slack_service import SlackService
-from app.services.timesheet_service import TimesheetService
+from app.database import get_db, run_db, DBSession
+from app.services.slack_service import SlackService, get_slack_service
+from app.services.timesheet_service import TimesheetService, SUMMARY_DIMENSIONS
+from app.services.report_service import ReportService
+from app.services.report_cache import report_cache
+from app.services.async_timesheet_service import AsyncTimesheetService
 from app.utils.block_builder import BlockBuilder
+from app.utils.signed_url import sign_url
 from app.config import get_settings
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,21 +16,60 @@ settings = get_settings()
 
 
 class CommandHandler:
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(
+        self,
+        db: DBSession = Depends(get_db),
+        slack_service: SlackService = Depends(get_slack_service)
+    ):
         self.db = db
-        self.slack_service = SlackService()
+        self.slack_service = slack_service
         self.block_builder = BlockBuilder()
     
-    async def handle_timesheet_command(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        # Show initial form
-        blocks = self.block_builder.build_initial_form()
+    async def handle_timesheet_command(self, payload: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
+        # Show initial form, pre-serialized at startup
+        return self.block_builder.initial_form_response()
+    
+    @staticmethod
+    def _parse_summary(text: str) -> Optional[List[str]]:
+        # Accepts "summary", "summary by user", "summary by client" and "summary by user,client"
+        words = (text or '').strip().lower().split(None, 1)
+        if not words or words[0] != 'summary':
+            return None
+        
+        rest = words[1] if len(words) > 1 else ''
+        if rest.startswith('by'):
+            rest = rest[2:]
+        requested = [part.strip() for part in rest.replace(' ', ',').split(',') if part.strip()]
+        group_by = [dim for dim in SUMMARY_DIMENSIONS if dim in requested]
+        return group_by or ['user']
+    
+    def _export_response(self, text: str, user_id: str, start) -> Optional[Dict[str, Any]]:
+        # "export" or "export ndjson" hands the manager a short-lived signed download link
+        words = (text or '').strip().lower().split()
+        if not words or words[0] != 'export':
+            return None
         
+        export_format = 'ndjson' if 'ndjson' in words[1:] else 'csv'
+        url = sign_url(
+            "/export/entries",
+            user_id,
+            {'format': export_format, 'start': start.date().isoformat()},
+            settings.export_link_ttl
+        )
         return {
             "response_type": "ephemeral",
-            "blocks": blocks,
-            "text": "Fill your timesheet"
+            "text": f"📥 <{url}|Download entries as {export_format.upper()}> (link expires in {settings.export_link_ttl // 60} minutes)"
         }
     
+    async def _summary_blocks(self, report: str, start, group_by: List[str], title: str) -> List[Dict[str, Any]]:
+        cache_key = report_cache.key(report, start, "summary:" + ",".join(group_by))
+        blocks = report_cache.get(cache_key)
+        if blocks is None:
+            rows = await AsyncTimesheetService.get_summary(self.db, start, group_by, ReportService.period_end(report, start))
+            blocks = self.block_builder.build_summary_blocks(rows, title, group_by)
+            report_cache.set(cache_key, blocks)
+        return blocks
+    
     async def handle_weekly_report(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         user_id = payload.get('user_id')
         
@@ -38,12 +80,20 @@ class CommandHandler:
                 "text": "⚠️ You don't have permission to view reports."
             }
         
-        # Get weekly entries
-        entries = TimesheetService.get_weekly_entries(self.db)
-        blocks = self.block_builder.build_report_blocks(
-            entries,
-            "📊 Weekly Timesheet Report"
-        )
+        export = self._export_response(payload.get('text', ''), user_id, TimesheetService.week_start())
+        if export:
+            return export
+        
+        group_by = self._parse_summary(payload.get('text', ''))
+        if group_by:
+            return {
+                "response_type": "ephemeral",
+                "blocks": await self._summary_blocks('weekly', TimesheetService.week_start(), group_by, "📊 Weekly Timesheet Summary"),
+                "text": "Weekly Summary"
+            }
+        
+        # First page of this week's entries
+        blocks = await run_db(self.db, ReportService.render_page, 'weekly')
         
         return {
             "response_type": "ephemeral",
@@ -61,12 +111,20 @@ class CommandHandler:
                 "text": "⚠️ You don't have permission to view reports."
             }
         
-        # Get monthly entries
-        entries = TimesheetService.get_monthly_entries(self.db)
-        blocks = self.block_builder.build_report_blocks(
-            entries,
-            "📊 Monthly Timesheet Report"
-        )
+        export = self._export_response(payload.get('text', ''), user_id, TimesheetService.month_start())
+        if export:
+            return export
+        
+        group_by = self._parse_summary(payload.get('text', ''))
+        if group_by:
+            return {
+                "response_type": "ephemeral",
+                "blocks": await self._summary_blocks('monthly', TimesheetService.month_start(), group_by, "📊 Monthly Timesheet Summary"),
+                "text": "Monthly Summary"
+            }
+        
+        # First page of this month's entries
+        blocks = await run_db(self.db, ReportService.render_page, 'monthly')
         
         return {
             "response_type": "ephemeral",
@@ -0,0 +1,52 @@
+from fastapi import Depends
+from app.database import get_db, run_db, DBSession
+from app.services.channel_service import ChannelService
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventHandler:
+    def __init__(self, db: DBSession = Depends(get_db)):
+        self.db = db
+    
+    async def handle_event(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        event = payload.get('event', {})
+        event_type = event.get('type')
+        channel_id = self._channel_id(event)
+        
+        logger.info(f"📥 Handling event: {event_type}")
+        
+        if not channel_id:
+            return {"status": "ok"}
+        
+        if event_type == 'member_joined_channel':
+            # Events for a channel only arrive while the bot is a member of it
+            await run_db(self.db, ChannelService.set_membership, channel_id, is_active=True)
+        elif event_type in ('channel_left', 'group_left'):
+            await run_db(self.db, ChannelService.set_membership, channel_id, is_active=False)
+        elif event_type == 'member_left_channel' and event.get('user') == self._bot_user_id(payload):
+            await run_db(self.db, ChannelService.set_membership, channel_id, is_active=False)
+        elif event_type in ('channel_archive', 'group_archive'):
+            await run_db(self.db, ChannelService.set_membership, channel_id, is_active=False, is_archived=True)
+        
+        return {"status": "ok"}
+    
+    @staticmethod
+    def idempotency_key(payload: Dict[str, Any]) -> Optional[str]:
+        # Slack re-sends an event with the same event_id when the first delivery was slow
+        event_id = payload.get('event_id')
+        return f"event:{event_id}" if event_id else None
+    
+    @staticmethod
+    def _channel_id(event: Dict[str, Any]) -> Optional[str]:
+        channel = event.get('channel')
+        if isinstance(channel, dict):
+            return channel.get('id')
+        return channel
+    
+    @staticmethod
+    def _bot_user_id(payload: Dict[str, Any]) -> Optional[str]:
+        authorizations = payload.get('authorizations') or [{}]
+        return authorizations[0].get('user_id')
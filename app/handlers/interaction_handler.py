@@ -1,22 +1,33 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.slack_service import SlackService
+from app.database import get_db, run_db, session_scope, DBSession
+from app.services.slack_service import SlackService, get_slack_service
 from app.services.timesheet_service import TimesheetService
+from app.services.report_service import ReportService
+from app.services.async_timesheet_service import AsyncTimesheetService
+from app.services.outbox_service import OutboxService
 from app.utils.block_builder import BlockBuilder
-from typing import Dict, Any
+from app.utils.task_pool import BackgroundTaskPool, get_task_pool
+from app.config import get_settings
+from typing import Dict, Any, List, Optional, Union
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class InteractionHandler:
-    def __init__(self, db: Session = Depends(get_db)):
+    def __init__(
+        self,
+        db: DBSession = Depends(get_db),
+        slack_service: SlackService = Depends(get_slack_service),
+        task_pool: Optional[BackgroundTaskPool] = Depends(get_task_pool)
+    ):
         self.db = db
-        self.slack_service = SlackService()
+        self.slack_service = slack_service
+        self.task_pool = task_pool
         self.block_builder = BlockBuilder()
     
-    async def handle_interaction(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_interaction(self, payload: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
         action_id = payload.get('actions', [{}])[0].get('action_id', '')
         
         logger.info(f"🎯 Handling action: {action_id}")
@@ -25,7 +36,11 @@ class InteractionHandler:
         if action_id == 'show_entry_forms':
             return await self._handle_show_forms(payload)
         elif action_id == 'submit_timesheet':
+            if settings.interaction_ack_first and self.task_pool is not None:
+                return await self._defer_submit(payload)
             return await self._handle_submit(payload)
+        elif action_id in ('report_page_next', 'report_page_prev'):
+            return await self._handle_report_page(payload)
         elif action_id == 'entry_count_select':
             # Dropdown selection - just acknowledge, no action needed
             logger.info("📝 Dropdown selection received (no action required)")
@@ -34,7 +49,29 @@ class InteractionHandler:
         logger.warning(f"⚠️ Unknown action: {action_id}")
         return {"text": "Unknown action"}
     
-    async def _handle_show_forms(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_report_page(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if payload.get('user', {}).get('id') != settings.slack_manager_user_id:
+            return {
+                "response_type": "ephemeral",
+                "replace_original": "false",
+                "text": "⚠️ You don't have permission to view reports."
+            }
+        
+        try:
+            cursor = payload['actions'][0]['value']
+            blocks = await run_db(self.db, ReportService.render_page, 'weekly', cursor=cursor)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            # A tampered or malformed cursor (e.g. a non-string date or short key)
+            logger.error(f"❌ Invalid report cursor: {str(e)}")
+            return {"text": "❌ This report page is no longer available.", "response_type": "ephemeral"}
+        
+        return {
+            "blocks": blocks,
+            "replace_original": "true",
+            "response_type": "ephemeral"
+        }
+    
+    async def _handle_show_forms(self, payload: Dict[str, Any]) -> Union[Dict[str, Any], bytes]:
         try:
             logger.info("📝 Processing show_entry_forms action")
             
@@ -48,18 +85,9 @@ class InteractionHandler:
             
             logger.info(f"✅ Building form for {num_entries} entries")
             
-            # Build entry forms
-            blocks = self.block_builder.build_entry_forms(num_entries)
-            
-            logger.info(f"📤 Returning {len(blocks)} blocks")
-            
-            # For ephemeral messages (which /timesheet creates), we need to replace via the response
-            # Return the blocks directly - FastAPI JSONResponse will handle it
-            return {
-                "blocks": blocks,
-                "replace_original": "true",  # String, not boolean for JSON
-                "response_type": "ephemeral"
-            }
+            # For ephemeral messages (which /timesheet creates), we need to replace via the response.
+            # The forms for 1-5 entries are serialized once at startup and sent as-is
+            return self.block_builder.entry_forms_response(num_entries)
             
         except Exception as e:
             logger.error(f"❌ Error showing forms: {str(e)}", exc_info=True)
@@ -237,55 +265,110 @@ class InteractionHandler:
     #     }
 
     
+    @staticmethod
+    def idempotency_key(payload: Dict[str, Any]) -> Optional[str]:
+        # Only submissions write anything. Keying on the form message rather than the
+        # trigger_id makes a double-click on Submit and a redelivery the same request.
+        action = payload.get('actions', [{}])[0]
+        if action.get('action_id') != 'submit_timesheet':
+            return None
+        
+        user_id = payload.get('user', {}).get('id', '')
+        form_ts = payload.get('container', {}).get('message_ts') or payload.get('message', {}).get('ts')
+        instance = form_ts or payload.get('trigger_id') or action.get('action_ts')
+        return f"submit:{user_id}:{instance}" if instance else None
+
+    @staticmethod
+    def _parse_entries(state_values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        entries = []
+        i = 0
+        while f'client_block_{i}' in state_values:
+            client_name = state_values[f'client_block_{i}'][f'client_input_{i}']['value']
+            hours_value = state_values[f'hours_block_{i}'][f'hours_input_{i}'].get('value', '0')
+
+            proof_data = state_values.get(f'proof_block_{i}', {}).get(f'proof_input_{i}', {})
+            files = proof_data.get('files', [])
+
+            entries.append({
+                'client_name': client_name,
+                'hours': hours_value,
+                'proof_url': None,
+                'file_id': files[0]['id'] if files else None
+            })
+            i += 1
+        return entries
+
+    async def _defer_submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response_url = payload.get('response_url')
+        try:
+            # Cheap validation up front so obvious mistakes are reported in the ack itself
+            state_values = payload.get('state', {}).get('values', {})
+            TimesheetService.validate_entries(self._parse_entries(state_values))
+        except (KeyError, TypeError, ValueError) as e:
+            return {
+                "text": f"❌ Submission failed: {str(e)}",
+                "response_type": "ephemeral",
+                "replace_original": "false"
+            }
+
+        if not response_url or not self.task_pool.submit(self._run_deferred_submit, payload, self.slack_service):
+            logger.warning("⚠️ Could not defer submission, processing inline")
+            return await self._handle_submit(payload)
+
+        logger.info("📨 Submission acknowledged, processing in background")
+        return {
+            "blocks": [{
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": "⏳ *Submitting your timesheet…*"}
+            }],
+            "text": "Submitting your timesheet…",
+            "replace_original": "true",
+            "response_type": "ephemeral"
+        }
+
+    @staticmethod
+    async def _run_deferred_submit(payload: Dict[str, Any], slack_service: SlackService):
+        # The request's session is gone by now, so the background task owns its own
+        async with session_scope() as db:
+            handler = InteractionHandler(db, slack_service, None)
+            result = await handler._handle_submit(payload)
+
+        if 'errors' in result:
+            message = {
+                "text": "❌ " + "\n".join(result['errors'].values()) + "\nPlease run `/timesheet` again.",
+                "response_type": "ephemeral",
+                "replace_original": True
+            }
+        else:
+            message = {
+                "blocks": result['blocks'],
+                "text": "Timesheet submitted",
+                "response_type": "ephemeral",
+                "replace_original": True
+            }
+        await slack_service.send_response(payload['response_url'], message)
+    
     async def _handle_submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         try:
             user_id = payload['user']['id']
-            user_name = payload['user'].get('username', payload['user'].get('name', 'Unknown'))
+            # Stable display name from the (cached) profile rather than the payload's handle
+            user_name = await self.slack_service.get_display_name(
+                user_id,
+                payload['user'].get('username', payload['user'].get('name', 'Unknown'))
+            )
             channel_id = payload.get('channel', {}).get('id', 'unknown')
             state_values = payload.get('state', {}).get('values', {})
             message_ts = payload.get('message', {}).get('ts')  # Added safely
 
-            entries = []
-            i = 0
-            while f'client_block_{i}' in state_values:
-                client_name = state_values[f'client_block_{i}'][f'client_input_{i}']['value']
-                hours_value = state_values[f'hours_block_{i}'][f'hours_input_{i}'].get('value', '0')
-                hours = float(hours_value)
-
-                proof_url = None
-                proof_data = state_values.get(f'proof_block_{i}', {}).get(f'proof_input_{i}', {})
-                files = proof_data.get('files', [])
-                if files:
-                    file_id = files[0]['id']
-                    file_info = self.slack_service.get_file_info(file_id)
-                    if file_info:
-                        proof_url = file_info.get('url_private')
-
-                TimesheetService.create_entry(
-                    db=self.db,
-                    user_id=user_id,
-                    username=user_name,
-                    channel_id=channel_id,
-                    client_name=client_name,
-                    hours=hours,
-                    proof_url=proof_url
-                )
-
-                entries.append({'client': client_name, 'hours': hours})
-                i += 1
-
-            confirmation_text = "✅ Timesheet submitted successfully!\n\n"
-            for idx, entry in enumerate(entries, 1):
-                confirmation_text += f"{idx}. {entry['client']} - {entry['hours']} hours\n"
-
-            self.slack_service.send_dm(
-                user_id,
-                [{
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": confirmation_text}
-                }],
-                "Timesheet submitted"
-            )
+            entries = self._parse_entries(state_values)
+
+            # Resolve every proof file for the submission concurrently
+            file_ids = [entry['file_id'] for entry in entries if entry['file_id']]
+            file_infos = await self.slack_service.get_files_info(file_ids) if file_ids else {}
+            for entry in entries:
+                file_info = file_infos.get(entry.pop('file_id'))
+                if file_info:
+                    entry['proof_url'] = file_info.get('url_private')
 
             confirmation_blocks = [
                 {
@@ -294,13 +377,45 @@ class InteractionHandler:
                 }
             ]
 
-            if channel_id and message_ts:
-                self.slack_service.update_message(
-                    channel_id,
-                    message_ts,
-                    confirmation_blocks,
+            def outbound(created: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                confirmation_text = "✅ Timesheet submitted successfully!\n\n"
+                for idx, entry in enumerate(created, 1):
+                    confirmation_text += f"{idx}. {entry['client_name']} - {entry['hours']} hours\n"
+
+                messages = [OutboxService.message(
+                    'dm',
+                    user_id,
+                    [{
+                        "type": "section",
+                        "text": {"type": "mrkdwn", "text": confirmation_text}
+                    }],
                     "Timesheet submitted"
-                )
+                )]
+                if channel_id and message_ts:
+                    messages.append(OutboxService.message(
+                        'update',
+                        channel_id,
+                        confirmation_blocks,
+                        "Timesheet submitted",
+                        ts=message_ts
+                    ))
+                return messages
+
+            # Validate and save the whole timesheet in a single transaction; the confirmation
+            # DM and form update are queued in that same transaction and sent by the outbox
+            created = await AsyncTimesheetService.create_entries(
+                db=self.db,
+                user_id=user_id,
+                username=user_name,
+                channel_id=channel_id,
+                entries=entries,
+                idempotency_key=self.idempotency_key(payload),
+                outbound=outbound
+            )
+
+            if entries and not created:
+                # Saved by an earlier delivery of this submission, which already queued the DM
+                logger.info(f"🔁 Duplicate submission from {user_id} ignored")
 
             return {"response_action": "update", "blocks": confirmation_blocks}
 
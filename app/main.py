@@ -1,11 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.routers import slack_router
-from app.database import init_db
+from app.routers import slack_router, export_router
+from app.database import init_db, SessionLocal, async_engine
+from app.services.channel_service import ChannelService
+from app.services.partition_service import PartitionService
+from app.services.slack_service import SlackService
+from app.services.report_cache import report_cache
 from app.utils.scheduler import TaskScheduler
+from app.utils.task_pool import BackgroundTaskPool
+from app.utils.health import ReadinessProbe
+from app.utils.idempotency import IdempotencyCache
+from app.utils.outbox import OutboxDrainer
+from app.utils.block_builder import BlockBuilder
+from app.utils.metrics import REQUEST_LATENCY, track_task_pool
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from app.config import get_settings
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -15,7 +28,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-scheduler = TaskScheduler()
+slack_service = SlackService()
+scheduler = TaskScheduler(slack_service)
+task_pool = BackgroundTaskPool(settings.background_workers, settings.background_queue_size)
+readiness = ReadinessProbe(scheduler, settings.health_cache_ttl)
+outbox = OutboxDrainer(slack_service, settings.outbox_workers, settings.outbox_batch_size)
+idempotency_cache = IdempotencyCache(settings.idempotency_cache_size, settings.idempotency_ttl)
 
 
 @asynccontextmanager
@@ -23,6 +41,26 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Slack Timesheet Bot...")
     init_db()
+    BlockBuilder.precompute()
+    db = SessionLocal()
+    try:
+        seeded = ChannelService.backfill_from_entries(db)
+        if seeded:
+            logger.info(f"Seeded channel registry with {seeded} channels")
+        # Inserts fail without a partition for the month, so never rely on the nightly job alone
+        PartitionService.premake(db, settings.partition_premake_months)
+    finally:
+        db.close()
+    await report_cache.start()
+    await slack_service.start()
+    app.state.slack_service = slack_service
+    await task_pool.start()
+    track_task_pool(task_pool)
+    app.state.task_pool = task_pool
+    app.state.idempotency_cache = idempotency_cache
+    if settings.slack_warm_user_cache:
+        task_pool.submit(slack_service.warm_user_cache)
+    await outbox.start()
     scheduler.start()
     logger.info("Application started successfully")
     
@@ -30,7 +68,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down...")
-    scheduler.stop()
+    await scheduler.stop()
+    await outbox.stop()
+    await task_pool.stop()
+    await slack_service.close()
+    await report_cache.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
     logger.info("Application stopped")
 
 
@@ -50,8 +94,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_slack_latency(request: Request, call_next):
+    if not request.url.path.startswith("/slack/"):
+        return await call_next(request)
+    
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, so made-up URLs can't add time series
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        REQUEST_LATENCY.labels(path, str(status)).observe(time.perf_counter() - started_at)
+
+
 # Include routers
 app.include_router(slack_router.router)
+app.include_router(export_router.router)
 
 
 @app.get("/")
@@ -65,9 +128,27 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "scheduler": "running"
-    }
+    # Liveness: the process is up and serving; dependencies are covered by /ready
+    return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    result = await readiness.check()
+    return JSONResponse(content=result, status_code=200 if result["status"] == "ready" else 503)
+
+
+@app.get("/stats/tasks")
+async def task_pool_stats():
+    return task_pool.stats()
+
+
+@app.get("/stats/caches")
+async def cache_stats():
+    return {**slack_service.cache_stats(), "reports": report_cache.stats()}
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
@@ -0,0 +1,49 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import text
+from app.config import get_settings
+from app.database import Base, engine
+import app.models.timesheet  # noqa: F401
+import app.models.channel  # noqa: F401
+import app.models.rollup  # noqa: F401
+import app.models.job_run  # noqa: F401
+import app.models.outbound_message  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Every app process runs migrations on startup; the lock makes sure only one does at a time
+MIGRATION_LOCK_ID = 7_215_001
+
+
+def run_migrations_offline():
+    context.configure(
+        url=get_settings().database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"}
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+        try:
+            context.configure(connection=connection, target_metadata=target_metadata)
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,78 @@
+"""Initial schema: timesheet entries, channel registry and daily rollups
+
+Databases created by the old init_db() -> create_all() are adopted as-is:
+tables that already exist are left alone.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    
+    if not inspector.has_table('timesheet_entries'):
+        op.create_table(
+            'timesheet_entries',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.String(50), nullable=False),
+            sa.Column('username', sa.String(100), nullable=False),
+            sa.Column('channel_id', sa.String(50), nullable=False),
+            sa.Column('client_name', sa.String(200), nullable=False),
+            sa.Column('hours', sa.Float(), nullable=False),
+            sa.Column('proof_url', sa.Text(), nullable=True),
+            sa.Column('submission_date', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+        )
+        op.create_index('ix_timesheet_entries_id', 'timesheet_entries', ['id'])
+        op.create_index('ix_timesheet_entries_user_id', 'timesheet_entries', ['user_id'])
+        op.create_index('ix_timesheet_entries_submission_date', 'timesheet_entries', ['submission_date'])
+    
+    if not inspector.has_table('channels'):
+        op.create_table(
+            'channels',
+            sa.Column('channel_id', sa.String(50), primary_key=True),
+            sa.Column('is_active', sa.Boolean(), nullable=False),
+            sa.Column('is_archived', sa.Boolean(), nullable=False),
+            sa.Column('last_submission_at', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+        op.create_index('ix_channels_is_active', 'channels', ['is_active'])
+    
+    if not inspector.has_table('timesheet_daily_rollups'):
+        op.create_table(
+            'timesheet_daily_rollups',
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('user_id', sa.String(50), primary_key=True),
+            sa.Column('client_name', sa.String(200), primary_key=True),
+            sa.Column('username', sa.String(100), nullable=False),
+            sa.Column('total_hours', sa.Float(), nullable=False),
+            sa.Column('entry_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+        )
+        op.create_index('ix_timesheet_daily_rollups_user_day', 'timesheet_daily_rollups', ['user_id', 'day'])
+        
+        # Backfill from whatever entries predate the rollup table
+        op.execute("""
+            INSERT INTO timesheet_daily_rollups (day, user_id, client_name, username, total_hours, entry_count, updated_at)
+            SELECT CAST(submission_date AS DATE), user_id, client_name, MAX(username), SUM(hours), COUNT(id), NOW()
+            FROM timesheet_entries
+            WHERE submission_date IS NOT NULL
+            GROUP BY CAST(submission_date AS DATE), user_id, client_name
+        """)
+
+
+def downgrade():
+    op.drop_table('timesheet_daily_rollups')
+    op.drop_table('channels')
+    op.drop_table('timesheet_entries')
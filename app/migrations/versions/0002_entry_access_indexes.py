@@ -0,0 +1,50 @@
+"""Composite indexes matching timesheet_entries access patterns
+
+Built CONCURRENTLY so a large table stays writable while they are created.
+The single-column user_id and submission_date indexes are dropped because the
+composite indexes cover them as a leading column.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    # get_user_entries
+    'ix_timesheet_entries_user_id_submission_date': 'btree (user_id, submission_date)',
+    # Client-filtered reports and exports
+    'ix_timesheet_entries_submission_date_client_name': 'btree (submission_date, client_name)',
+    # Keyset pagination for paged reports
+    'ix_timesheet_entries_submission_date_id': 'btree (submission_date, id)',
+    'ix_timesheet_entries_channel_id': 'btree (channel_id)',
+    # Tiny summary index for wide date-range scans over append-only data
+    'ix_timesheet_entries_submission_date_brin': 'brin (submission_date)',
+}
+
+SUPERSEDED = {
+    'ix_timesheet_entries_user_id': 'btree (user_id)',
+    'ix_timesheet_entries_submission_date': 'btree (submission_date)',
+}
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON timesheet_entries USING {definition}")
+        for name in SUPERSEDED:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in SUPERSEDED.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON timesheet_entries USING {definition}")
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
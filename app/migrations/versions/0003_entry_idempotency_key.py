@@ -0,0 +1,32 @@
+"""Idempotency key on timesheet entries
+
+Each entry of a submission stores "<submission key>:<index>". The unique index
+lets a redelivered or double-clicked submission insert nothing the second time.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('timesheet_entries', sa.Column('idempotency_key', sa.String(128), nullable=True))
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_timesheet_entries_idempotency_key "
+            "ON timesheet_entries (idempotency_key)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_timesheet_entries_idempotency_key")
+    op.drop_column('timesheet_entries', 'idempotency_key')
@@ -0,0 +1,33 @@
+"""Scheduler job runs
+
+Records each scheduled occurrence so that, with several app processes, a job
+runs once per occurrence and a newly elected leader can catch up missed runs.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scheduler_job_runs',
+        sa.Column('job_id', sa.String(50), primary_key=True),
+        sa.Column('scheduled_for', sa.DateTime(timezone=True), primary_key=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('worker', sa.String(100), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_job_runs')
@@ -0,0 +1,45 @@
+"""Outbox for outbound Slack messages
+
+Messages are written in the same transaction as the data they describe and
+delivered by the drain workers in app/utils/outbox.py.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'outbound_messages',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('target', sa.String(100), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        'ix_outbound_messages_pending',
+        'outbound_messages',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_outbound_messages_pending', table_name='outbound_messages')
+    op.drop_table('outbound_messages')
@@ -0,0 +1,133 @@
+"""Partition timesheet_entries by month on submission_date
+
+The existing table is swapped for a range-partitioned one and its rows are
+copied across, so this takes an exclusive lock on timesheet_entries for the
+duration of the copy. Partitions are created from the oldest entry's month
+through a few months ahead; TaskScheduler keeps creating them after that.
+
+Unique indexes on a partitioned table must include the partition key, which a
+per-entry idempotency key cannot, so those keys move to timesheet_entry_keys.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import date
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+COLUMNS = 'id, user_id, username, channel_id, client_name, hours, proof_url, submission_date, created_at, idempotency_key'
+
+INDEXES = {
+    'ix_timesheet_entries_id': 'btree (id)',
+    'ix_timesheet_entries_user_id_submission_date': 'btree (user_id, submission_date)',
+    'ix_timesheet_entries_submission_date_client_name': 'btree (submission_date, client_name)',
+    'ix_timesheet_entries_submission_date_id': 'btree (submission_date, id)',
+    'ix_timesheet_entries_channel_id': 'btree (channel_id)',
+    'ix_timesheet_entries_submission_date_brin': 'brin (submission_date)',
+}
+
+
+def _month(value: date, offset: int = 0) -> date:
+    months = value.year * 12 + value.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def upgrade():
+    op.create_table(
+        'timesheet_entry_keys',
+        sa.Column('idempotency_key', sa.String(128), primary_key=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.execute("""
+        INSERT INTO timesheet_entry_keys (idempotency_key, created_at)
+        SELECT idempotency_key, COALESCE(created_at, NOW())
+        FROM timesheet_entries
+        WHERE idempotency_key IS NOT NULL
+    """)
+
+    op.execute("ALTER TABLE timesheet_entries RENAME TO timesheet_entries_legacy")
+    op.execute("ALTER TABLE timesheet_entries_legacy RENAME CONSTRAINT timesheet_entries_pkey TO timesheet_entries_legacy_pkey")
+    for name in list(INDEXES) + ['uq_timesheet_entries_idempotency_key']:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # Keep the id sequence alive when the old table goes
+    op.execute("ALTER SEQUENCE timesheet_entries_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE timesheet_entries (
+            id INTEGER NOT NULL DEFAULT nextval('timesheet_entries_id_seq'),
+            user_id VARCHAR(50) NOT NULL,
+            username VARCHAR(100) NOT NULL,
+            channel_id VARCHAR(50) NOT NULL,
+            client_name VARCHAR(200) NOT NULL,
+            hours DOUBLE PRECISION NOT NULL,
+            proof_url TEXT,
+            submission_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            idempotency_key VARCHAR(128),
+            PRIMARY KEY (id, submission_date)
+        ) PARTITION BY RANGE (submission_date)
+    """)
+    op.execute("ALTER SEQUENCE timesheet_entries_id_seq OWNED BY timesheet_entries.id")
+
+    oldest = op.get_bind().execute(sa.text(
+        "SELECT MIN(COALESCE(submission_date, created_at)) FROM timesheet_entries_legacy"
+    )).scalar()
+    month = _month(oldest.date() if oldest else date.today())
+    last = _month(date.today(), PREMAKE_MONTHS)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE timesheet_entries_y{month.year:04d}m{month.month:02d} PARTITION OF timesheet_entries "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month(month, 1).isoformat()}')"
+        )
+        month = _month(month, 1)
+
+    op.execute(f"""
+        INSERT INTO timesheet_entries ({COLUMNS})
+        SELECT id, user_id, username, channel_id, client_name, hours, proof_url,
+               COALESCE(submission_date, created_at, NOW()), created_at, idempotency_key
+        FROM timesheet_entries_legacy
+    """)
+    op.execute("DROP TABLE timesheet_entries_legacy")
+
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON timesheet_entries USING {definition}")
+
+
+def downgrade():
+    op.execute("ALTER TABLE timesheet_entries RENAME TO timesheet_entries_partitioned")
+    op.execute("ALTER TABLE timesheet_entries_partitioned RENAME CONSTRAINT timesheet_entries_pkey TO timesheet_entries_partitioned_pkey")
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER SEQUENCE timesheet_entries_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE timesheet_entries (
+            id INTEGER PRIMARY KEY DEFAULT nextval('timesheet_entries_id_seq'),
+            user_id VARCHAR(50) NOT NULL,
+            username VARCHAR(100) NOT NULL,
+            channel_id VARCHAR(50) NOT NULL,
+            client_name VARCHAR(200) NOT NULL,
+            hours DOUBLE PRECISION NOT NULL,
+            proof_url TEXT,
+            submission_date TIMESTAMP WITHOUT TIME ZONE,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            idempotency_key VARCHAR(128)
+        )
+    """)
+    op.execute("ALTER SEQUENCE timesheet_entries_id_seq OWNED BY timesheet_entries.id")
+    op.execute(f"INSERT INTO timesheet_entries ({COLUMNS}) SELECT {COLUMNS} FROM timesheet_entries_partitioned")
+    op.execute("DROP TABLE timesheet_entries_partitioned")
+
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON timesheet_entries USING {definition}")
+    op.execute("CREATE UNIQUE INDEX uq_timesheet_entries_idempotency_key ON timesheet_entries (idempotency_key)")
+    op.drop_table('timesheet_entry_keys')
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Boolean, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class Channel(Base):
+    __tablename__ = "channels"
+    
+    channel_id = Column(String(50), primary_key=True)
+    is_active = Column(Boolean, nullable=False, default=True, index=True)
+    is_archived = Column(Boolean, nullable=False, default=False)
+    last_submission_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<Channel(id={self.channel_id}, active={self.is_active})>"
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class JobRun(Base):
+    __tablename__ = "scheduler_job_runs"
+    
+    # One row per scheduled occurrence; the primary key is what makes a run happen once
+    job_id = Column(String(50), primary_key=True)
+    scheduled_for = Column(DateTime(timezone=True), primary_key=True)
+    status = Column(String(20), nullable=False)
+    worker = Column(String(100), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self):
+        return f"<JobRun(job={self.job_id}, scheduled_for={self.scheduled_for}, status={self.status})>"
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Text, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from app.database import Base
+
+
+class OutboundMessage(Base):
+    __tablename__ = "outbound_messages"
+    
+    id = Column(BigInteger, primary_key=True)
+    kind = Column(String(20), nullable=False)
+    target = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Drain workers only ever look at pending rows that are due
+        Index('ix_outbound_messages_pending', 'next_attempt_at', postgresql_where=text("status = 'pending'")),
+    )
+    
+    def __repr__(self):
+        return f"<OutboundMessage(id={self.id}, kind={self.kind}, status={self.status})>"
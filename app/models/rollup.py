@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
+from datetime import datetime
+from app.database import Base
+
+
+class DailyRollup(Base):
+    __tablename__ = "timesheet_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    user_id = Column(String(50), primary_key=True)
+    client_name = Column(String(200), primary_key=True)
+    username = Column(String(100), nullable=False)
+    total_hours = Column(Float, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_timesheet_daily_rollups_user_day', 'user_id', 'day'),
+    )
+    
+    def __repr__(self):
+        return f"<DailyRollup(day={self.day}, user={self.user_id}, client={self.client_name}, hours={self.total_hours})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
 from datetime import datetime
 from app.database import Base
 
@@ -6,15 +6,41 @@ from app.database import Base
 class TimesheetEntry(Base):
     __tablename__ = "timesheet_entries"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String(50), nullable=False, index=True)
+    # The table is range-partitioned by month on submission_date, which therefore has to
+    # be part of the primary key (see app.services.partition_service)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    user_id = Column(String(50), nullable=False)
     username = Column(String(100), nullable=False)
     channel_id = Column(String(50), nullable=False)
     client_name = Column(String(200), nullable=False)
     hours = Column(Float, nullable=False)
     proof_url = Column(Text, nullable=True)
-    submission_date = Column(DateTime, default=datetime.utcnow, index=True)
+    submission_date = Column(DateTime, primary_key=True, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
+    idempotency_key = Column(String(128), nullable=True)
+    
+    # Indexes are managed by the Alembic migrations in app/migrations; keep these in sync
+    __table_args__ = (
+        # get_user_entries
+        Index('ix_timesheet_entries_user_id_submission_date', 'user_id', 'submission_date'),
+        # Client-filtered reports and exports
+        Index('ix_timesheet_entries_submission_date_client_name', 'submission_date', 'client_name'),
+        # Keyset pagination for paged reports
+        Index('ix_timesheet_entries_submission_date_id', 'submission_date', 'id'),
+        Index('ix_timesheet_entries_channel_id', 'channel_id'),
+        Index('ix_timesheet_entries_submission_date_brin', 'submission_date', postgresql_using='brin'),
+        {'postgresql_partition_by': 'RANGE (submission_date)'},
+    )
     
     def __repr__(self):
         return f"<TimesheetEntry(user={self.username}, client={self.client_name}, hours={self.hours})>"
+
+
+class TimesheetEntryKey(Base):
+    # Unique indexes on a partitioned table must include the partition key, so the
+    # idempotency keys that make redelivered submissions and re-run imports no-ops
+    # are claimed here instead
+    __tablename__ = "timesheet_entry_keys"
+    
+    idempotency_key = Column(String(128), primary_key=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
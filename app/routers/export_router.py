@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import StreamingResponse
+from app.database import SessionLocal
+from app.services.timesheet_service import TimesheetService
+from app.utils.signed_url import verify_signed_params
+from app.config import get_settings
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+import csv
+import io
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/export", tags=["export"])
+settings = get_settings()
+
+EXPORT_COLUMNS = ['id', 'user_id', 'username', 'channel_id', 'client_name', 'hours', 'proof_url', 'submission_date', 'created_at']
+EXPORT_BATCH_SIZE = 1000
+
+
+def _row_dict(row: Any) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    for key in ('submission_date', 'created_at'):
+        if data[key] is not None:
+            data[key] = data[key].isoformat()
+    return data
+
+
+def _stream_entries(export_format: str, filters: Dict[str, Any]) -> Iterator[bytes]:
+    # Runs in Starlette's threadpool; the session lives as long as the stream
+    db = SessionLocal()
+    try:
+        rows = TimesheetService.iter_entries(db, batch_size=EXPORT_BATCH_SIZE, **filters)
+        if export_format == 'ndjson':
+            batch = []
+            for row in rows:
+                batch.append(json.dumps(_row_dict(row)))
+                if len(batch) >= EXPORT_BATCH_SIZE:
+                    yield ("\n".join(batch) + "\n").encode()
+                    batch = []
+            if batch:
+                yield ("\n".join(batch) + "\n").encode()
+        else:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for count, row in enumerate(rows, 1):
+                writer.writerow(_row_dict(row))
+                if count % EXPORT_BATCH_SIZE == 0:
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue().encode()
+    finally:
+        db.close()
+
+
+@router.get("/entries")
+async def export_entries(
+    request: Request,
+    format: str = "csv",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user_id: Optional[str] = None,
+    client_name: Optional[str] = None
+):
+    # Links are minted by the report commands for the manager and expire
+    params = dict(request.query_params)
+    if verify_signed_params(params) != settings.slack_manager_user_id:
+        raise HTTPException(status_code=403, detail="Invalid or expired export link")
+    
+    if format not in ('csv', 'ndjson'):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    
+    filters = {
+        'start': datetime.combine(start, datetime.min.time()) if start else None,
+        'end': datetime.combine(end + timedelta(days=1), datetime.min.time()) if end else None,
+        'user_id': user_id,
+        'client_name': client_name
+    }
+    logger.info(f"Exporting entries as {format}: {filters}")
+    
+    media_type = "application/x-ndjson" if format == 'ndjson' else "text/csv"
+    return StreamingResponse(
+        _stream_entries(format, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=timesheet_entries.{format}"}
+    )
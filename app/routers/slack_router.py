@@ -1,163 +1,109 @@
-from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Request, Depends
+from app.database import get_db, DBSession
+from app.services.slack_service import SlackService, get_slack_service
+from app.utils.task_pool import BackgroundTaskPool, get_task_pool
+from app.utils.idempotency import IdempotencyCache, get_idempotency_cache
 from app.handlers.interaction_handler import InteractionHandler
 from app.handlers.command_handler import CommandHandler
+from app.handlers.event_handler import EventHandler
 from app.utils.block_builder import BlockBuilder
+from app.utils.responses import slack_response
+from app.utils.slack_request import get_slack_payload
 from app.config import get_settings
-import json
-import hmac
-import hashlib
-import time
+from typing import Any, Dict
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/slack", tags=["slack"])
+# Every /slack/* request is signature-checked before it reaches a route
+router = APIRouter(prefix="/slack", tags=["slack"], dependencies=[Depends(get_slack_payload)])
 settings = get_settings()
 
 
-def verify_slack_signature(request: Request, body: bytes) -> bool:
-    timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
-    slack_signature = request.headers.get("X-Slack-Signature", "")
-    
-    # Prevent replay attacks
-    if abs(time.time() - int(timestamp)) > 60 * 5:
-        return False
-    
-    sig_basestring = f"v0:{timestamp}:{body.decode()}"
-    my_signature = 'v0=' + hmac.new(
-        settings.slack_signing_secret.encode(),
-        sig_basestring.encode(),
-        hashlib.sha256
-    ).hexdigest()
-    
-    return hmac.compare_digest(my_signature, slack_signature)
-
-
 @router.post("/events")
-async def handle_events(request: Request, db: Session = Depends(get_db)):
-    body = await request.body()
-    
-    # Verify signature
-    if not verify_slack_signature(request, body):
-        raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    payload = await request.json()
-    
+async def handle_events(
+    request: Request,
+    payload: Dict[str, Any] = Depends(get_slack_payload),
+    db: DBSession = Depends(get_db),
+    idempotency: IdempotencyCache = Depends(get_idempotency_cache)
+):
     # Handle URL verification
     if payload.get("type") == "url_verification":
         return {"challenge": payload.get("challenge")}
     
-    # Handle events
-    event = payload.get("event", {})
+    retry_num = request.headers.get("X-Slack-Retry-Num")
+    if retry_num:
+        logger.info(f"🔁 Slack retry #{retry_num} ({request.headers.get('X-Slack-Retry-Reason', 'unknown')})")
     
-    # Log event for debugging
-    logger.info(f"Received event: {event.get('type')}")
+    # Handle events; a retried delivery replays the first result
+    handler = EventHandler(db)
+    response = await idempotency.run(
+        handler.idempotency_key(payload),
+        lambda: handler.handle_event(payload)
+    )
     
-    return JSONResponse(content={"status": "ok"})
+    return slack_response(response)
 
 
 @router.post("/interactions")
-async def handle_interactions(request: Request, db: Session = Depends(get_db)):
-    body = await request.body()
-    
-    # Verify signature
-    if not verify_slack_signature(request, body):
-        raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    # Parse payload
-    form_data = await request.form()
-    payload = json.loads(form_data.get("payload", "{}"))
-    
+async def handle_interactions(
+    payload: Dict[str, Any] = Depends(get_slack_payload),
+    db: DBSession = Depends(get_db),
+    slack_service: SlackService = Depends(get_slack_service),
+    task_pool: BackgroundTaskPool = Depends(get_task_pool),
+    idempotency: IdempotencyCache = Depends(get_idempotency_cache)
+):
     interaction_type = payload.get("type")
     
     # Handle different interaction types
     if interaction_type == "block_actions":
-        handler = InteractionHandler(db)
-        response = await handler.handle_interaction(payload)
-        return JSONResponse(content=response)
+        handler = InteractionHandler(db, slack_service, task_pool)
+        # Double-clicks and redeliveries of a submission get the first response
+        response = await idempotency.run(
+            handler.idempotency_key(payload),
+            lambda: handler.handle_interaction(payload)
+        )
+        return slack_response(response)
     
     elif interaction_type == "view_submission":
         # Handle modal submission if needed
-        return JSONResponse(content={"response_action": "clear"})
+        return slack_response({"response_action": "clear"})
     
-    return JSONResponse(content={"status": "ok"})
+    return slack_response({"status": "ok"})
 
 
 @router.post("/commands/timesheet")
-async def handle_timesheet_command(request: Request, db: Session = Depends(get_db)):
-    body = await request.body()
-    
-    # Verify signature
-    # if not verify_slack_signature(request, body):
-    #     raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    form_data = await request.form()
-    payload = {
-        "user_id": form_data.get("user_id"),
-        "channel_id": form_data.get("channel_id"),
-        "text": form_data.get("text", "")
-    }
-    
-    handler = CommandHandler(db)
+async def handle_timesheet_command(
+    payload: Dict[str, Any] = Depends(get_slack_payload),
+    db: DBSession = Depends(get_db),
+    slack_service: SlackService = Depends(get_slack_service)
+):
+    handler = CommandHandler(db, slack_service)
     response = await handler.handle_timesheet_command(payload)
     
-    logger.info(body)
-    logger.info(payload)
-    logger.info(response)
+    logger.debug(payload)
     
-    return JSONResponse(content=response)
+    return slack_response(response)
 
 
 @router.post("/commands/timesheet-weekly")
-async def handle_weekly_report(request: Request, db: Session = Depends(get_db)):
-    body = await request.body()
-    
-    # Verify signature
-    # if not verify_slack_signature(request, body):
-    #     raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    form_data = await request.form()
-    payload = {
-        "user_id": form_data.get("user_id"),
-        "channel_id": form_data.get("channel_id")
-    }
-    
-    handler = CommandHandler(db)
+async def handle_weekly_report(
+    payload: Dict[str, Any] = Depends(get_slack_payload),
+    db: DBSession = Depends(get_db),
+    slack_service: SlackService = Depends(get_slack_service)
+):
+    handler = CommandHandler(db, slack_service)
     response = await handler.handle_weekly_report(payload)
     
-    return JSONResponse(content=response)
+    return slack_response(response)
 
 
 @router.post("/commands/timesheet-monthly")
-async def handle_monthly_report(request: Request, db: Session = Depends(get_db)):
-    body = await request.body()
-    
-    # Verify signature
-    # if not verify_slack_signature(request, body):
-    #     raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    form_data = await request.form()
-    payload = {
-        "user_id": form_data.get("user_id"),
-        "channel_id": form_data.get("channel_id")
-    }
-    # Extract action information
-    action_id = payload.get('actions', [{}])[0].get('action_id', '') if payload.get('actions') else ''
-
-    # Log what's happening
-    logger.info(f"Received interaction - Type: {interaction_type}, Action: {action_id}")
-    logger.debug(f"Full payload: {json.dumps(payload, indent=2)}")
-
-    # Log response
-    logger.info(f"Returning response: {json.dumps(response, indent=2)}")
-
-    # Error logging
-    logger.error("Invalid signature for interaction request")
-    logger.warning(f"Unhandled interaction type: {interaction_type}")
-    
-    handler = CommandHandler(db)
+async def handle_monthly_report(
+    payload: Dict[str, Any] = Depends(get_slack_payload),
+    db: DBSession = Depends(get_db),
+    slack_service: SlackService = Depends(get_slack_service)
+):
+    handler = CommandHandler(db, slack_service)
     response = await handler.handle_monthly_report(payload)
     
-    return JSONResponse(content=response)
\ No newline at end of file
+    return slack_response(response)
\ No newline at end of file
@@ -0,0 +1,57 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import DBSession
+from app.services.timesheet_service import TimesheetService, Outbound
+from app.services.report_cache import report_cache
+from app.utils.metrics import timed_query
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+
+class AsyncTimesheetService:
+    # Awaitable counterparts of TimesheetService for the request path. They run natively
+    # on an AsyncSession and fall back to the sync implementation for a plain Session,
+    # so handlers work unchanged whichever DB_ASYNC mode is selected.
+    
+    @staticmethod
+    @timed_query('async_create_entries')
+    async def create_entries(
+        db: DBSession,
+        user_id: str,
+        username: str,
+        channel_id: str,
+        entries: List[Dict[str, Any]],
+        idempotency_key: Optional[str] = None,
+        outbound: Optional[Outbound] = None
+    ) -> List[Dict[str, Any]]:
+        if not isinstance(db, AsyncSession):
+            return TimesheetService.create_entries(db, user_id, username, channel_id, entries, idempotency_key, outbound)
+        
+        try:
+            claimed = None
+            if idempotency_key and entries:
+                claimed = set(await db.scalars(TimesheetService.claim_keys_stmt(idempotency_key, len(entries))))
+            stmt = TimesheetService.insert_entries_stmt(user_id, username, channel_id, entries, idempotency_key, claimed)
+            created = [dict(row) for row in (await db.execute(stmt)).mappings()] if stmt is not None else []
+            for derived in TimesheetService.derived_stmts(created, outbound):
+                await db.execute(derived)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        if created:
+            report_cache.invalidate_submission(created[0]['submission_date'])
+        return created
+    
+    @staticmethod
+    @timed_query('async_get_summary')
+    async def get_summary(
+        db: DBSession,
+        start: datetime,
+        group_by: List[str],
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        if not isinstance(db, AsyncSession):
+            return TimesheetService.get_summary(db, start, group_by, end)
+        
+        result = await db.execute(TimesheetService.summary_stmt(start, group_by, end))
+        return [dict(row) for row in result.mappings()]
@@ -0,0 +1,71 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from app.models.channel import Channel
+from app.models.timesheet import TimesheetEntry
+from datetime import datetime
+from typing import List, Optional
+
+
+class ChannelService:
+    @staticmethod
+    def record_submission_stmt(channel_id: str, submitted_at: datetime):
+        # New channels start active; existing ones keep their membership state
+        stmt = insert(Channel).values(
+            channel_id=channel_id,
+            is_active=True,
+            is_archived=False,
+            last_submission_at=submitted_at,
+            created_at=submitted_at,
+            updated_at=submitted_at
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[Channel.channel_id],
+            set_={
+                'last_submission_at': stmt.excluded.last_submission_at,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+    
+    @staticmethod
+    def set_membership(db: Session, channel_id: str, is_active: bool, is_archived: Optional[bool] = None):
+        now = datetime.utcnow()
+        values = {'is_active': is_active, 'updated_at': now}
+        if is_archived is not None:
+            values['is_archived'] = is_archived
+        
+        stmt = insert(Channel).values(channel_id=channel_id, created_at=now, is_archived=False, **values)
+        db.execute(stmt.on_conflict_do_update(index_elements=[Channel.channel_id], set_=values))
+        db.commit()
+    
+    @staticmethod
+    def backfill_from_entries(db: Session) -> int:
+        # One-off seed for databases that predate the channels table
+        if db.scalar(select(Channel.channel_id).limit(1)) is not None:
+            return 0
+        
+        now = datetime.utcnow()
+        source = select(
+            TimesheetEntry.channel_id,
+            literal(True),
+            literal(False),
+            func.max(TimesheetEntry.submission_date),
+            literal(now),
+            literal(now)
+        ).where(
+            TimesheetEntry.channel_id != 'unknown'
+        ).group_by(TimesheetEntry.channel_id)
+        
+        stmt = insert(Channel).from_select(
+            ['channel_id', 'is_active', 'is_archived', 'last_submission_at', 'created_at', 'updated_at'],
+            source
+        ).on_conflict_do_nothing(index_elements=[Channel.channel_id])
+        result = db.execute(stmt)
+        db.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def get_active_channel_ids(db: Session) -> List[str]:
+        return list(db.scalars(
+            select(Channel.channel_id).where(Channel.is_active.is_(True))
+        ))
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from app.models.job_run import JobRun
+from datetime import datetime, timedelta, timezone
+
+
+class JobRunService:
+    @staticmethod
+    def claim(db: Session, job_id: str, scheduled_for: datetime, worker: str, stale_after: float) -> bool:
+        # The first worker to insert the occurrence owns it. A run left "running" by a
+        # worker that died is taken over once it is older than stale_after seconds.
+        now = datetime.now(timezone.utc)
+        stmt = insert(JobRun).values(
+            job_id=job_id,
+            scheduled_for=scheduled_for,
+            status='running',
+            worker=worker,
+            started_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobRun.job_id, JobRun.scheduled_for],
+            set_={'worker': worker, 'started_at': now},
+            where=(JobRun.status == 'running') & (JobRun.started_at < now - timedelta(seconds=stale_after))
+        ).returning(JobRun.job_id)
+        
+        claimed = db.execute(stmt).first() is not None
+        db.commit()
+        return claimed
+    
+    @staticmethod
+    def finish(db: Session, job_id: str, scheduled_for: datetime, status: str):
+        db.execute(
+            update(JobRun)
+            .where(JobRun.job_id == job_id, JobRun.scheduled_for == scheduled_for)
+            .values(status=status, finished_at=datetime.now(timezone.utc))
+        )
+        db.commit()
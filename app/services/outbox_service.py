@@ -0,0 +1,100 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from app.models.outbound_message import OutboundMessage
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+MESSAGE_KINDS = ('dm', 'post', 'update')
+
+
+class OutboxService:
+    @staticmethod
+    def message(
+        kind: str,
+        target: str,
+        blocks: List[Dict[str, Any]],
+        text: str = "",
+        ts: Optional[str] = None
+    ) -> Dict[str, Any]:
+        if kind not in MESSAGE_KINDS:
+            raise ValueError(f"Unknown outbound message kind: {kind}")
+        payload = {'blocks': blocks, 'text': text}
+        if ts:
+            payload['ts'] = ts
+        return {'kind': kind, 'target': target, 'payload': payload}
+    
+    @staticmethod
+    def enqueue_stmt(messages: List[Dict[str, Any]]):
+        # Executed inside the caller's transaction so messages commit (or not) with its data
+        now = datetime.utcnow()
+        rows = [
+            {**message, 'status': 'pending', 'attempts': 0, 'next_attempt_at': now, 'created_at': now}
+            for message in messages
+        ]
+        return insert(OutboundMessage).values(rows)
+    
+    @staticmethod
+    def enqueue(db: Session, messages: List[Dict[str, Any]]):
+        if not messages:
+            return
+        db.execute(OutboxService.enqueue_stmt(messages))
+        db.commit()
+    
+    @staticmethod
+    def claim_batch(db: Session, limit: int, lease: float) -> List[Dict[str, Any]]:
+        # SKIP LOCKED lets every worker in every replica claim a disjoint batch. Claimed rows
+        # are leased rather than locked, so a worker that dies only delays its batch.
+        now = datetime.utcnow()
+        due = (
+            select(OutboundMessage.id)
+            .where(OutboundMessage.status == 'pending', OutboundMessage.next_attempt_at <= now)
+            .order_by(OutboundMessage.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(OutboundMessage)
+            .where(OutboundMessage.id.in_(due.scalar_subquery()))
+            .values(attempts=OutboundMessage.attempts + 1, next_attempt_at=now + timedelta(seconds=lease))
+            .returning(
+                OutboundMessage.id,
+                OutboundMessage.kind,
+                OutboundMessage.target,
+                OutboundMessage.payload,
+                OutboundMessage.attempts
+            )
+        )
+        try:
+            claimed = [dict(row) for row in db.execute(stmt).mappings()]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return claimed
+    
+    @staticmethod
+    def mark_sent(db: Session, message_ids: List[int]):
+        db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id.in_(message_ids))
+            .values(status='sent', sent_at=datetime.utcnow(), last_error=None)
+        )
+        db.commit()
+    
+    @staticmethod
+    def mark_retry(db: Session, message_id: int, error: str, delay: float):
+        db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == message_id)
+            .values(next_attempt_at=datetime.utcnow() + timedelta(seconds=delay), last_error=error)
+        )
+        db.commit()
+    
+    @staticmethod
+    def mark_failed(db: Session, message_id: int, error: str):
+        db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == message_id)
+            .values(status='failed', last_error=error)
+        )
+        db.commit()
@@ -0,0 +1,156 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+import gzip
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "timesheet_entries"
+PARTITION_PATTERN = re.compile(r"^timesheet_entries_y(\d{4})m(\d{2})$")
+ARCHIVE_SUFFIX = ".csv.gz"
+ARCHIVE_COLUMNS = [
+    'id', 'user_id', 'username', 'channel_id', 'client_name', 'hours',
+    'proof_url', 'submission_date', 'created_at', 'idempotency_key'
+]
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    months = value.year * 12 + value.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = PARTITION_PATTERN.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+class PartitionService:
+    # Monthly range partitions of timesheet_entries. Statements run in the caller's
+    # transaction; nothing here commits except the archive/restore operations, which
+    # have to line up with the files they write and read. Months are on the naive UTC clock
+    # submission_date is written with.
+
+    @staticmethod
+    def list_partitions(db: Session) -> List[Tuple[str, date]]:
+        rows = db.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+        """), {"parent": PARENT_TABLE}).scalars()
+        partitions = [(name, partition_month(name)) for name in rows]
+        return sorted((name, month) for name, month in partitions if month is not None)
+
+    @staticmethod
+    def ensure_partitions(db: Session, start: date, end: date) -> List[str]:
+        # Creates any missing monthly partition from start's month through end's month
+        existing = {name for name, _ in PartitionService.list_partitions(db)}
+        created = []
+        month = month_start(start)
+        while month <= end:
+            name = partition_name(month)
+            if name not in existing:
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+                ))
+                created.append(name)
+            month = month_start(month, 1)
+
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+        return created
+
+    @staticmethod
+    def premake(db: Session, months_ahead: int) -> List[str]:
+        today = datetime.utcnow().date()
+        created = PartitionService.ensure_partitions(db, today, month_start(today, months_ahead))
+        db.commit()
+        return created
+
+    @staticmethod
+    def expired_partitions(db: Session, retention_months: int) -> List[str]:
+        cutoff = month_start(datetime.utcnow().date(), -retention_months)
+        return [name for name, month in PartitionService.list_partitions(db) if month < cutoff]
+
+    @staticmethod
+    def archive_partition(db: Session, name: str, archive_dir: Path) -> Path:
+        # Write the rows out and make the file durable before touching the parent: DETACH
+        # locks timesheet_entries exclusively, so it only comes at the end, for DETACH and
+        # DROP alone. The SHARE lock keeps writes out of this (expired) month meanwhile
+        # without blocking anything else.
+        if partition_month(name) is None:
+            raise ValueError(f"Not a timesheet_entries partition: {name}")
+
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        path = archive_dir / f"{name}{ARCHIVE_SUFFIX}"
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        try:
+            db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+            cursor = db.connection().connection.dbapi_connection.cursor()
+            with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as archive:
+                cursor.copy_expert(
+                    f"COPY {name} ({', '.join(ARCHIVE_COLUMNS)}) TO STDOUT WITH (FORMAT csv, HEADER)",
+                    archive
+                )
+            with open(tmp_path, "rb") as archive:
+                os.fsync(archive.fileno())
+            os.replace(tmp_path, path)
+
+            # Give up rather than queue every request behind a long-running query
+            db.execute(text("SET LOCAL lock_timeout = '5s'"))
+            db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # The partition is still attached, so a leftover archive would only duplicate it
+            tmp_path.unlink(missing_ok=True)
+            path.unlink(missing_ok=True)
+            raise
+
+        logger.info(f"Archived partition {name} to {path}")
+        return path
+
+    @staticmethod
+    def restore_partition(db: Session, path: Path) -> str:
+        # Rows are copied through the parent, so they land in the month's partition
+        # whether it is recreated here or already exists
+        name = path.name[:-len(ARCHIVE_SUFFIX)] if path.name.endswith(ARCHIVE_SUFFIX) else path.name
+        month = partition_month(name)
+        if month is None:
+            raise ValueError(f"Not a timesheet_entries archive: {path}")
+
+        try:
+            PartitionService.ensure_partitions(db, month, month)
+            cursor = db.connection().connection.dbapi_connection.cursor()
+            with gzip.open(path, "rt", encoding="utf-8", newline="") as archive:
+                cursor.copy_expert(
+                    f"COPY {PARENT_TABLE} ({', '.join(ARCHIVE_COLUMNS)}) FROM STDIN WITH (FORMAT csv, HEADER)",
+                    archive
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Restored {path} into partition {name}")
+        return name
+
+    @staticmethod
+    def archive_expired(db: Session, retention_months: int, archive_dir: Path) -> List[Path]:
+        archived = []
+        for name in PartitionService.expired_partitions(db, retention_months):
+            archived.append(PartitionService.archive_partition(db, name, archive_dir))
+        return archived
@@ -0,0 +1,145 @@
+from sqlalchemy import func, select
+from app.config import get_settings
+from app.utils.ttl_cache import TTLCache
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Period = Tuple[str, str]
+
+
+def affected_periods(submitted_at: datetime) -> List[Period]:
+    # Reports run from the start of the current week/month, so an entry only
+    # changes the weekly and monthly periods it falls in. submitted_at is naive UTC,
+    # the same clock TimesheetService.week_start/month_start key the periods on.
+    day = submitted_at.replace(hour=0, minute=0, second=0, microsecond=0)
+    week = day - timedelta(days=day.weekday())
+    return [('weekly', week.isoformat()), ('monthly', day.replace(day=1).isoformat())]
+
+
+class MemoryInvalidation:
+    # Single worker: invalidating the local cache is all there is to do
+    async def start(self, on_invalidate: Callable[[Optional[List[Period]]], None]):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    def notify_stmt(self, periods: Optional[List[Period]]):
+        return None
+
+
+class PostgresNotifyInvalidation:
+    # Several workers: writers NOTIFY inside their transaction, so every worker's
+    # listener drops the periods exactly when the entries become visible
+    CHANNEL = "report_cache_invalidate"
+    
+    def __init__(self, database_url: str):
+        scheme, rest = database_url.split("://", 1)
+        self.dsn = f"postgresql://{rest}"
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self, on_invalidate: Callable[[Optional[List[Period]]], None]):
+        self._task = asyncio.create_task(self._listen(on_invalidate))
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def notify_stmt(self, periods: Optional[List[Period]]):
+        # None invalidates every period
+        return select(func.pg_notify(self.CHANNEL, json.dumps(periods)))
+    
+    async def _listen(self, on_invalidate: Callable[[Optional[List[Period]]], None]):
+        import asyncpg
+        
+        def handle(connection, pid, channel, payload):
+            periods = json.loads(payload)
+            on_invalidate(None if periods is None else [tuple(period) for period in periods])
+        
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.error(f"Report cache listener could not connect: {e}")
+                await asyncio.sleep(5)
+                continue
+            
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda connection: closed.set())
+            try:
+                await conn.add_listener(self.CHANNEL, handle)
+                # Notifications may have been missed while disconnected
+                on_invalidate(None)
+                logger.info("Report cache listening for invalidations")
+                await closed.wait()
+                logger.warning("Report cache listener connection lost, reconnecting")
+            finally:
+                if not conn.is_closed():
+                    await conn.close()
+
+
+class ReportCache:
+    def __init__(self, maxsize: int, ttl: float, backend):
+        self._cache = TTLCache(maxsize, ttl)
+        # Invalidating a period bumps its generation; entries under older keys are never read again
+        self._generations: Dict[Period, int] = {}
+        self.backend = backend
+    
+    def key(self, report: str, start: datetime, filters: str = "") -> Hashable:
+        # Take the key before querying: a write that lands meanwhile moves the
+        # generation on, so the stale result is stored where no one looks
+        period = (report, start.isoformat())
+        return period + (self._generations.get(period, 0), filters)
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self._cache.get(key)
+    
+    def set(self, key: Hashable, value: Any):
+        self._cache.set(key, value)
+    
+    def invalidate(self, periods: Optional[List[Period]]):
+        if periods is None:
+            self._generations.clear()
+            self._cache.clear()
+            return
+        for period in periods:
+            self._generations[period] = self._generations.get(period, 0) + 1
+    
+    def notify_stmt(self, submitted_at: datetime):
+        return self.backend.notify_stmt(affected_periods(submitted_at))
+    
+    def notify_all_stmt(self):
+        # For bulk writes spanning any number of periods
+        return self.backend.notify_stmt(None)
+    
+    def invalidate_submission(self, submitted_at: datetime):
+        self.invalidate(affected_periods(submitted_at))
+    
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+    
+    async def start(self):
+        await self.backend.start(self.invalidate)
+    
+    async def stop(self):
+        await self.backend.stop()
+
+
+def _build_backend():
+    if settings.report_cache_backend == "postgres":
+        return PostgresNotifyInvalidation(settings.database_url)
+    return MemoryInvalidation()
+
+
+report_cache = ReportCache(settings.report_cache_size, settings.report_cache_ttl, _build_backend())
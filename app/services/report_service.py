@@ -0,0 +1,93 @@
+from sqlalchemy.orm import Session
+from app.services.timesheet_service import TimesheetService
+from app.services.report_cache import report_cache
+from app.utils.block_builder import BlockBuilder
+from app.config import get_settings
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+import json
+
+settings = get_settings()
+
+REPORT_TITLES = {
+    'weekly': "📊 Weekly Timesheet Report",
+    'monthly': "📊 Monthly Timesheet Report"
+}
+
+# Each entry takes 3 blocks and the page chrome 5, so 15 is the most that fits in 50 blocks
+MAX_PAGE_SIZE = 15
+
+
+def encode_cursor(report: str, start: datetime, direction: str, key: tuple) -> str:
+    return json.dumps({
+        'r': report,
+        's': start.isoformat(),
+        direction: [key[0].isoformat(), key[1]]
+    }, separators=(',', ':'))
+
+
+def decode_cursor(value: str) -> Dict[str, Any]:
+    data = json.loads(value)
+    cursor = {
+        'report': data['r'],
+        'start': datetime.fromisoformat(data['s']),
+        'after': None,
+        'before': None
+    }
+    for direction in ('after', 'before'):
+        if direction in data:
+            cursor[direction] = (datetime.fromisoformat(data[direction][0]), int(data[direction][1]))
+    return cursor
+
+
+class ReportService:
+    @staticmethod
+    def period_start(report: str) -> datetime:
+        if report == 'weekly':
+            return TimesheetService.week_start()
+        return TimesheetService.month_start()
+    
+    @staticmethod
+    def period_end(report: str, start: datetime) -> datetime:
+        if report == 'weekly':
+            return TimesheetService.week_end(start)
+        return TimesheetService.month_end(start)
+    
+    @staticmethod
+    def render_page(db: Session, report: str, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        if cursor:
+            position = decode_cursor(cursor)
+            report = position['report']
+        else:
+            position = {'start': ReportService.period_start(report), 'after': None, 'before': None}
+        
+        start = position['start']
+        # A cursor can outlive its period (a summary DM paged next month), so bound both queries
+        end = ReportService.period_end(report, start)
+        cache_key = report_cache.key(report, start, cursor or "")
+        blocks = report_cache.get(cache_key)
+        if blocks is not None:
+            return blocks
+        
+        page = TimesheetService.get_entries_page(
+            db,
+            start,
+            limit=max(1, min(settings.report_page_size, MAX_PAGE_SIZE)),
+            after=position['after'],
+            before=position['before'],
+            end=end
+        )
+        total_hours, _ = TimesheetService.get_period_totals(db, start, end)
+        
+        next_cursor = encode_cursor(report, start, 'after', page['last_key']) if page['has_next'] and page['last_key'] else None
+        prev_cursor = encode_cursor(report, start, 'before', page['first_key']) if page['has_prev'] and page['first_key'] else None
+        
+        blocks = BlockBuilder.build_report_blocks(
+            page['entries'],
+            REPORT_TITLES[report],
+            total_hours=total_hours,
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor
+        )
+        report_cache.set(cache_key, blocks)
+        return blocks
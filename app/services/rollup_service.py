@@ -0,0 +1,82 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, func, cast, Date, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from app.models.rollup import DailyRollup
+from app.models.timesheet import TimesheetEntry
+from app.services.partition_service import PartitionService, month_start
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+
+class RollupService:
+    @staticmethod
+    def apply_entries_stmt(entries: List[Dict[str, Any]]):
+        totals: Dict[tuple, Dict[str, Any]] = {}
+        for entry in entries:
+            key = (entry['submission_date'].date(), entry['user_id'], entry['client_name'])
+            row = totals.setdefault(key, {
+                'day': key[0],
+                'user_id': key[1],
+                'client_name': key[2],
+                'username': entry['username'],
+                'total_hours': 0.0,
+                'entry_count': 0
+            })
+            row['total_hours'] += entry['hours']
+            row['entry_count'] += 1
+        
+        now = datetime.utcnow()
+        # Sorted keys keep lock order stable between concurrent submissions
+        rows = [dict(totals[key], updated_at=now) for key in sorted(totals)]
+        
+        stmt = insert(DailyRollup).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[DailyRollup.day, DailyRollup.user_id, DailyRollup.client_name],
+            set_={
+                'username': stmt.excluded.username,
+                'total_hours': DailyRollup.total_hours + stmt.excluded.total_hours,
+                'entry_count': DailyRollup.entry_count + stmt.excluded.entry_count,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+    
+    @staticmethod
+    def rebuild(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        day = cast(TimesheetEntry.submission_date, Date)
+        
+        # Only months whose partition is attached: archived months have no entries left to
+        # rebuild from, and their rollups are what keeps them in summaries
+        months = [month for _, month in PartitionService.list_partitions(db)]
+        if not months:
+            return 0
+        clear = delete(DailyRollup).where(or_(*(
+            and_(DailyRollup.day >= month, DailyRollup.day < month_start(month, 1)) for month in months
+        )))
+        source = select(
+            day,
+            TimesheetEntry.user_id,
+            TimesheetEntry.client_name,
+            func.max(TimesheetEntry.username),
+            func.sum(TimesheetEntry.hours),
+            func.count(TimesheetEntry.id),
+            func.now()
+        )
+        if start is not None:
+            clear = clear.where(DailyRollup.day >= start)
+            source = source.where(TimesheetEntry.submission_date >= datetime.combine(start, datetime.min.time()))
+        if end is not None:
+            clear = clear.where(DailyRollup.day <= end)
+            source = source.where(TimesheetEntry.submission_date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        source = source.group_by(day, TimesheetEntry.user_id, TimesheetEntry.client_name)
+        
+        try:
+            db.execute(clear)
+            result = db.execute(insert(DailyRollup).from_select(
+                ['day', 'user_id', 'client_name', 'username', 'total_hours', 'entry_count', 'updated_at'],
+                source
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return result.rowcount
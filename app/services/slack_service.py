@@ -1,79 +1,293 @@
-from slack_sdk import WebClient
+from fastapi import Request
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.async_slack_response import AsyncSlackResponse
+from slack_sdk.webhook.async_client import AsyncWebhookClient
 from slack_sdk.errors import SlackApiError
 from typing import List, Dict, Any, Optional
 from app.config import get_settings
+from app.utils.rate_limiter import SlackRateLimiter
+from app.utils.metrics import SLACK_API_LATENCY, SLACK_API_ERRORS, SLACK_API_RATE_LIMITED
+from app.utils.ttl_cache import TTLCache
+import aiohttp
+import asyncio
 import logging
+import random
+import time
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+TRANSIENT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, SlackApiError):
+        return error.response.get('error') or str(error)
+    return str(error) or type(error).__name__
+
+
+def _retry_after(error: SlackApiError) -> Optional[float]:
+    if error.response.status_code != 429:
+        return None
+    headers = error.response.headers or {}
+    value = headers.get('Retry-After') or headers.get('retry-after') or 1
+    return float(value)
+
 
 class SlackService:
     def __init__(self):
-        self.client = WebClient(token=settings.slack_bot_token)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.client: Optional[AsyncWebClient] = None
+        self._file_cache = TTLCache(settings.slack_file_cache_size, settings.slack_file_cache_ttl)
+        self._user_cache = TTLCache(settings.slack_user_cache_size, settings.slack_user_cache_ttl)
+        # A user's DM channel ID never changes, so it is kept much longer than profiles
+        self._dm_channel_cache = TTLCache(settings.slack_user_cache_size, settings.slack_dm_channel_ttl)
+        self.rate_limiter = SlackRateLimiter({
+            "chat.postMessage": (settings.slack_post_message_per_minute, settings.slack_post_message_burst)
+        })
+    
+    async def start(self):
+        if self._session is not None:
+            return
+        
+        # One keep-alive connection pool shared by every Slack API call
+        connector = aiohttp.TCPConnector(
+            limit=settings.slack_http_pool_size,
+            keepalive_timeout=settings.slack_http_keepalive_timeout
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.slack_http_timeout,
+            connect=settings.slack_http_connect_timeout
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self.client = AsyncWebClient(
+            token=settings.slack_bot_token,
+            base_url=settings.slack_api_base_url,
+            session=self._session,
+            timeout=settings.slack_http_timeout
+        )
+        logger.info("Slack client started")
     
-    def post_message(self, channel: str, blocks: List[Dict[str, Any]], text: str = "") -> Optional[str]:
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self.client = None
+            logger.info("Slack client closed")
+    
+    async def _call(self, method: str, max_retries: Optional[int] = None, **kwargs) -> AsyncSlackResponse:
+        if max_retries is None:
+            max_retries = settings.slack_max_retries
+        api_method = getattr(self.client, method.replace('.', '_'))
+        
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(method)
+            started_at = time.perf_counter()
+            try:
+                response = await api_method(**kwargs)
+                SLACK_API_LATENCY.labels(method).observe(time.perf_counter() - started_at)
+                self.rate_limiter.reward(method)
+                return response
+            except SlackApiError as e:
+                SLACK_API_LATENCY.labels(method).observe(time.perf_counter() - started_at)
+                SLACK_API_ERRORS.labels(method, _error_message(e)).inc()
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    SLACK_API_RATE_LIMITED.labels(method).inc()
+                if retry_after is None and e.response.status_code < 500:
+                    raise
+                if retry_after is not None:
+                    self.rate_limiter.penalize(method, retry_after)
+                if attempt >= max_retries:
+                    raise
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+            except TRANSIENT_ERRORS as e:
+                SLACK_API_LATENCY.labels(method).observe(time.perf_counter() - started_at)
+                SLACK_API_ERRORS.labels(method, type(e).__name__).inc()
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            
+            attempt += 1
+            logger.warning(f"Retrying {method} in {delay:.1f}s (attempt {attempt}/{max_retries})")
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        delay = min(settings.slack_retry_max_delay, settings.slack_retry_base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+    
+    async def post_message(self, channel: str, blocks: List[Dict[str, Any]], text: str = "") -> Optional[str]:
         try:
-            response = self.client.chat_postMessage(
+            response = await self._call(
+                "chat.postMessage",
                 channel=channel,
                 blocks=blocks,
                 text=text
             )
             return response['ts']
-        except SlackApiError as e:
-            logger.error(f"Error posting message: {e.response['error']}")
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error posting message: {_error_message(e)}")
             return None
     
-    def update_message(self, channel: str, ts: str, blocks: List[Dict[str, Any]], text: str = "") -> bool:
+    async def update_message(self, channel: str, ts: str, blocks: List[Dict[str, Any]], text: str = "") -> bool:
         try:
-            self.client.chat_update(
+            await self._call(
+                "chat.update",
                 channel=channel,
                 ts=ts,
                 blocks=blocks,
                 text=text
             )
             return True
-        except SlackApiError as e:
-            logger.error(f"Error updating message: {e.response['error']}")
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error updating message: {_error_message(e)}")
             return False
     
-    def get_channel_members(self, channel: str) -> List[str]:
+    async def get_channel_members(self, channel: str) -> List[str]:
         try:
-            response = self.client.conversations_members(channel=channel)
+            response = await self._call("conversations.members", channel=channel)
             return response['members']
-        except SlackApiError as e:
-            logger.error(f"Error getting channel members: {e.response['error']}")
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error getting channel members: {_error_message(e)}")
             return []
     
-    def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_info(self, user_id: str) -> Optional[Dict[str, Any]]:
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.users_info(user=user_id)
+            response = await self._call("users.info", user=user_id)
+            self._user_cache.set(user_id, response['user'])
             return response['user']
-        except SlackApiError as e:
-            logger.error(f"Error getting user info: {e.response['error']}")
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error getting user info: {_error_message(e)}")
             return None
     
-    def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+    async def get_display_name(self, user_id: str, default: str = "Unknown") -> str:
+        user = await self.get_user_info(user_id)
+        if not user:
+            return default
+        profile = user.get('profile', {})
+        return profile.get('display_name') or profile.get('real_name') or user.get('name') or default
+    
+    async def warm_user_cache(self) -> int:
+        # One paginated users.list fills the profile cache instead of a users.info per user
+        cursor = None
+        warmed = 0
         try:
-            response = self.client.files_info(file=file_id)
+            while True:
+                response = await self._call("users.list", limit=200, cursor=cursor)
+                for user in response['members']:
+                    self._user_cache.set(user['id'], user)
+                    warmed += 1
+                cursor = response.get('response_metadata', {}).get('next_cursor')
+                if not cursor:
+                    break
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error warming user cache: {_error_message(e)}")
+        
+        logger.info(f"Warmed user cache with {warmed} profiles")
+        return warmed
+    
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "users": self._user_cache.stats(),
+            "dm_channels": self._dm_channel_cache.stats(),
+            "files": self._file_cache.stats()
+        }
+    
+    async def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+        cached = self._file_cache.get(file_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self._call("files.info", file=file_id)
+            self._file_cache.set(file_id, response['file'])
             return response['file']
-        except SlackApiError as e:
-            logger.error(f"Error getting file info: {e.response['error']}")
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error getting file info: {_error_message(e)}")
             return None
     
-    def send_dm(self, user_id: str, blocks: List[Dict[str, Any]], text: str = "") -> bool:
-        try:
-            # Open DM channel
-            response = self.client.conversations_open(users=user_id)
+    async def get_files_info(self, file_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        unique_ids = list(dict.fromkeys(file_ids))
+        semaphore = asyncio.Semaphore(settings.slack_file_lookup_concurrency)
+        
+        async def lookup(file_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_file_info(file_id)
+        
+        # Lookups run side by side, so latency follows the slowest one rather than the sum
+        results = await asyncio.gather(*(lookup(file_id) for file_id in unique_ids))
+        return dict(zip(unique_ids, results))
+    
+    async def _dm_channel(self, user_id: str, max_retries: Optional[int] = None) -> str:
+        channel_id = self._dm_channel_cache.get(user_id)
+        if channel_id is None:
+            response = await self._call("conversations.open", max_retries=max_retries, users=user_id)
             channel_id = response['channel']['id']
-            
-            # Send message
-            self.client.chat_postMessage(
+            self._dm_channel_cache.set(user_id, channel_id)
+        return channel_id
+    
+    async def _send_dm(self, user_id: str, blocks: List[Dict[str, Any]], text: str = "", max_retries: Optional[int] = None):
+        channel_id = await self._dm_channel(user_id, max_retries)
+        
+        # Send message
+        try:
+            await self._call(
+                "chat.postMessage",
+                max_retries=max_retries,
                 channel=channel_id,
                 blocks=blocks,
                 text=text
             )
+        except SlackApiError:
+            # Don't keep a channel ID that may have stopped working
+            self._dm_channel_cache.delete(user_id)
+            raise
+    
+    async def deliver(self, kind: str, target: str, payload: Dict[str, Any]):
+        # Raising counterpart of the send methods, used by the outbox which owns retries.
+        # A single attempt each: sleeping through retries here could outlast the outbox
+        # lease and let another worker claim, and send, the same message again.
+        blocks = payload.get('blocks')
+        text = payload.get('text', '')
+        if kind == 'dm':
+            await self._send_dm(target, blocks, text, max_retries=0)
+        elif kind == 'post':
+            await self._call("chat.postMessage", max_retries=0, channel=target, blocks=blocks, text=text)
+        elif kind == 'update':
+            await self._call("chat.update", max_retries=0, channel=target, ts=payload['ts'], blocks=blocks, text=text)
+        else:
+            raise ValueError(f"Unknown outbound message kind: {kind}")
+    
+    async def send_dm(self, user_id: str, blocks: List[Dict[str, Any]], text: str = "") -> bool:
+        try:
+            await self._send_dm(user_id, blocks, text)
             return True
-        except SlackApiError as e:
-            logger.error(f"Error sending DM: {e.response['error']}")
-            return False
\ No newline at end of file
+        except (SlackApiError, *TRANSIENT_ERRORS) as e:
+            logger.error(f"Error sending DM: {_error_message(e)}")
+            return False
+    
+    async def send_response(self, response_url: str, payload: Dict[str, Any]) -> bool:
+        try:
+            webhook = AsyncWebhookClient(
+                url=response_url,
+                session=self._session,
+                timeout=settings.slack_http_timeout
+            )
+            response = await webhook.send_dict(payload)
+            if response.status_code != 200:
+                logger.error(f"Error posting to response_url: {response.status_code} {response.body}")
+                return False
+            return True
+        except TRANSIENT_ERRORS as e:
+            logger.error(f"Error posting to response_url: {str(e)}")
+            return False
+
+
+def get_slack_service(request: Request) -> SlackService:
+    return request.app.state.slack_service
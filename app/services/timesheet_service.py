@@ -1,12 +1,30 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from app.models.timesheet import TimesheetEntry
+from sqlalchemy import func, extract, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from app.models.timesheet import TimesheetEntry, TimesheetEntryKey
+from app.models.rollup import DailyRollup
+from app.services.channel_service import ChannelService
+from app.services.report_cache import report_cache
+from app.services.outbox_service import OutboxService
+from app.services.rollup_service import RollupService
+from app.utils.metrics import timed_query
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Set, Tuple
+import math
 
+MAX_HOURS_PER_ENTRY = 24
+MAX_CLIENT_NAME_LENGTH = 200
+
+SUMMARY_DIMENSIONS = ('user', 'client')
+
+
+# Builds the Slack messages announcing a batch from its saved rows; they are queued in
+# the outbox within the same transaction
+Outbound = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
 
 class TimesheetService:
     @staticmethod
+    @timed_query('create_entry')
     def create_entry(
         db: Session,
         user_id: str,
@@ -25,54 +43,375 @@ class TimesheetService:
             proof_url=proof_url
         )
         db.add(entry)
+        db.flush()
+        db.execute(RollupService.apply_entries_stmt([{
+            'user_id': entry.user_id,
+            'username': entry.username,
+            'client_name': entry.client_name,
+            'hours': entry.hours,
+            'submission_date': entry.submission_date
+        }]))
+        notify = report_cache.notify_stmt(entry.submission_date)
+        if notify is not None:
+            db.execute(notify)
         db.commit()
         db.refresh(entry)
+        report_cache.invalidate_submission(entry.submission_date)
         return entry
     
     @staticmethod
-    def get_weekly_entries(db: Session) -> List[Dict[str, Any]]:
-        week_start = datetime.now() - timedelta(days=datetime.now().weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    def validate_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        client_name = (entry.get('client_name') or '').strip()
+        if not client_name:
+            raise ValueError("client name is required")
+        if len(client_name) > MAX_CLIENT_NAME_LENGTH:
+            raise ValueError(f"client name is longer than {MAX_CLIENT_NAME_LENGTH} characters")
         
-        entries = db.query(TimesheetEntry).filter(
-            TimesheetEntry.submission_date >= week_start
-        ).all()
+        try:
+            hours = float(entry.get('hours'))
+        except (TypeError, ValueError):
+            raise ValueError("hours must be a number")
+        if not math.isfinite(hours) or hours <= 0 or hours > MAX_HOURS_PER_ENTRY:
+            raise ValueError(f"hours must be between 0 and {MAX_HOURS_PER_ENTRY}")
         
-        return [
-            {
-                'username': e.username,
-                'client_name': e.client_name,
-                'hours': e.hours,
-                'proof_url': e.proof_url,
-                'submission_date': e.submission_date.strftime('%Y-%m-%d %H:%M')
-            }
-            for e in entries
-        ]
+        return {
+            'client_name': client_name,
+            'hours': hours,
+            'proof_url': entry.get('proof_url')
+        }
     
     @staticmethod
-    def get_monthly_entries(db: Session) -> List[Dict[str, Any]]:
-        now = datetime.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    def validate_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not entries:
+            raise ValueError("No timesheet entries to submit")
         
-        entries = db.query(TimesheetEntry).filter(
-            TimesheetEntry.submission_date >= month_start
-        ).all()
+        validated = []
+        for idx, entry in enumerate(entries, 1):
+            try:
+                validated.append(TimesheetService.validate_entry(entry))
+            except ValueError as e:
+                raise ValueError(f"Entry #{idx}: {e}")
+        return validated
+    
+    @staticmethod
+    def insert_entries_stmt(
+        user_id: str,
+        username: str,
+        channel_id: str,
+        entries: List[Dict[str, Any]],
+        idempotency_key: Optional[str] = None,
+        claimed: Optional[Set[str]] = None
+    ):
+        # Validate the whole batch before touching the database
+        validated = TimesheetService.validate_entries(entries)
         
-        return [
+        now = datetime.utcnow()
+        rows = [
             {
-                'username': e.username,
-                'client_name': e.client_name,
-                'hours': e.hours,
-                'proof_url': e.proof_url,
-                'submission_date': e.submission_date.strftime('%Y-%m-%d %H:%M')
+                'user_id': user_id,
+                'username': username,
+                'channel_id': channel_id,
+                'client_name': entry['client_name'],
+                'hours': entry['hours'],
+                'proof_url': entry['proof_url'],
+                'submission_date': now,
+                'created_at': now,
+                'idempotency_key': f"{idempotency_key}:{idx}" if idempotency_key else None
             }
-            for e in entries
+            for idx, entry in enumerate(validated)
         ]
+        
+        # Rows whose key was not claimed belong to an already-saved submission
+        if claimed is not None:
+            rows = [row for row in rows if row['idempotency_key'] in claimed]
+            if not rows:
+                return None
+        
+        # One multi-row INSERT ... RETURNING for the whole batch
+        return insert(TimesheetEntry).values(rows).returning(
+            TimesheetEntry.id,
+            TimesheetEntry.user_id,
+            TimesheetEntry.username,
+            TimesheetEntry.channel_id,
+            TimesheetEntry.client_name,
+            TimesheetEntry.hours,
+            TimesheetEntry.proof_url,
+            TimesheetEntry.submission_date
+        )
     
     @staticmethod
-    def get_user_entries(db: Session, user_id: str, days: int = 7) -> List[TimesheetEntry]:
-        cutoff_date = datetime.now() - timedelta(days=days)
-        return db.query(TimesheetEntry).filter(
+    def claim_keys_stmt(idempotency_key: str, count: int):
+        # Returns the keys this transaction claimed; a concurrent duplicate blocks on the
+        # primary key until the first commits, then claims nothing
+        keys = [f"{idempotency_key}:{idx}" for idx in range(count)]
+        stmt = insert(TimesheetEntryKey).values([
+            {'idempotency_key': key, 'created_at': datetime.utcnow()} for key in keys
+        ])
+        return stmt.on_conflict_do_nothing(index_elements=[TimesheetEntryKey.idempotency_key]).returning(
+            TimesheetEntryKey.idempotency_key
+        )
+    
+    @staticmethod
+    def derived_stmts(created: List[Dict[str, Any]], outbound: Optional[Outbound] = None) -> List[Any]:
+        # Writes that must land in the same transaction as the entries themselves
+        if not created:
+            return []
+        
+        stmts = [RollupService.apply_entries_stmt(created)]
+        channel_id = created[0]['channel_id']
+        if channel_id and channel_id != 'unknown':
+            stmts.append(ChannelService.record_submission_stmt(channel_id, created[0]['submission_date']))
+        notify = report_cache.notify_stmt(created[0]['submission_date'])
+        if notify is not None:
+            stmts.append(notify)
+        messages = outbound(created) if outbound else []
+        if messages:
+            stmts.append(OutboxService.enqueue_stmt(messages))
+        return stmts
+    
+    @staticmethod
+    @timed_query('create_entries')
+    def create_entries(
+        db: Session,
+        user_id: str,
+        username: str,
+        channel_id: str,
+        entries: List[Dict[str, Any]],
+        idempotency_key: Optional[str] = None,
+        outbound: Optional[Outbound] = None
+    ) -> List[Dict[str, Any]]:
+        try:
+            claimed = None
+            if idempotency_key and entries:
+                claimed = set(db.scalars(TimesheetService.claim_keys_stmt(idempotency_key, len(entries))))
+            stmt = TimesheetService.insert_entries_stmt(user_id, username, channel_id, entries, idempotency_key, claimed)
+            created = [dict(row) for row in db.execute(stmt).mappings()] if stmt is not None else []
+            for derived in TimesheetService.derived_stmts(created, outbound):
+                db.execute(derived)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if created:
+            report_cache.invalidate_submission(created[0]['submission_date'])
+        return created
+    
+    # Periods are on the UTC clock submission_date is written with, so report windows and
+    # report_cache.affected_periods agree on which week/month an entry belongs to
+    
+    @staticmethod
+    def week_start() -> datetime:
+        now = datetime.utcnow()
+        week_start = now - timedelta(days=now.weekday())
+        return week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    @staticmethod
+    def month_start() -> datetime:
+        return datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    @staticmethod
+    def week_end(start: datetime) -> datetime:
+        return start + timedelta(days=7)
+    
+    @staticmethod
+    def month_end(start: datetime) -> datetime:
+        return (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+    
+    @staticmethod
+    def entry_to_dict(e: Any) -> Dict[str, Any]:
+        return {
+            'username': e.username,
+            'client_name': e.client_name,
+            'hours': e.hours,
+            'proof_url': e.proof_url,
+            'submission_date': e.submission_date.strftime('%Y-%m-%d %H:%M')
+        }
+    
+    # Statement builders are shared with app.tools.explain_check so plans are checked on the real queries.
+    # timesheet_entries is partitioned by month, so an upper bound keeps a scan to the period's partitions.
+    
+    @staticmethod
+    def entries_since_stmt(start: datetime, end: Optional[datetime] = None):
+        stmt = select(TimesheetEntry).where(TimesheetEntry.submission_date >= start)
+        if end is not None:
+            stmt = stmt.where(TimesheetEntry.submission_date < end)
+        return stmt
+    
+    @staticmethod
+    def user_entries_stmt(user_id: str, cutoff_date: datetime):
+        return select(TimesheetEntry).where(
             TimesheetEntry.user_id == user_id,
             TimesheetEntry.submission_date >= cutoff_date
-        ).all()
\ No newline at end of file
+        )
+    
+    @staticmethod
+    def summary_stmt(start: datetime, group_by: List[str], end: Optional[datetime] = None):
+        columns = []
+        group_columns = []
+        if 'user' in group_by:
+            columns += [DailyRollup.user_id, func.max(DailyRollup.username).label('username')]
+            group_columns.append(DailyRollup.user_id)
+        if 'client' in group_by:
+            columns.append(DailyRollup.client_name)
+            group_columns.append(DailyRollup.client_name)
+        
+        hours = func.sum(DailyRollup.total_hours).label('hours')
+        stmt = select(
+            *columns,
+            hours,
+            func.sum(DailyRollup.entry_count).label('entry_count')
+        ).where(
+            DailyRollup.day >= start.date()
+        )
+        if end is not None:
+            stmt = stmt.where(DailyRollup.day < end.date())
+        return stmt.group_by(*group_columns).order_by(hours.desc())
+    
+    @staticmethod
+    def period_totals_stmt(start: datetime, end: Optional[datetime] = None):
+        stmt = select(
+            func.coalesce(func.sum(DailyRollup.total_hours), 0),
+            func.coalesce(func.sum(DailyRollup.entry_count), 0)
+        ).where(DailyRollup.day >= start.date())
+        if end is not None:
+            stmt = stmt.where(DailyRollup.day < end.date())
+        return stmt
+    
+    @staticmethod
+    def entries_page_stmt(
+        start: datetime,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        end: Optional[datetime] = None
+    ):
+        key = tuple_(TimesheetEntry.submission_date, TimesheetEntry.id)
+        stmt = select(
+            TimesheetEntry.id,
+            TimesheetEntry.username,
+            TimesheetEntry.client_name,
+            TimesheetEntry.hours,
+            TimesheetEntry.proof_url,
+            TimesheetEntry.submission_date
+        ).where(TimesheetEntry.submission_date >= start)
+        if end is not None:
+            stmt = stmt.where(TimesheetEntry.submission_date < end)
+        
+        if before is not None:
+            stmt = stmt.where(key < tuple_(*before)).order_by(
+                TimesheetEntry.submission_date.desc(), TimesheetEntry.id.desc()
+            )
+        else:
+            if after is not None:
+                stmt = stmt.where(key > tuple_(*after))
+            stmt = stmt.order_by(TimesheetEntry.submission_date, TimesheetEntry.id)
+        return stmt.limit(limit + 1)
+    
+    @staticmethod
+    def export_stmt(
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        client_name: Optional[str] = None
+    ):
+        stmt = select(
+            TimesheetEntry.id,
+            TimesheetEntry.user_id,
+            TimesheetEntry.username,
+            TimesheetEntry.channel_id,
+            TimesheetEntry.client_name,
+            TimesheetEntry.hours,
+            TimesheetEntry.proof_url,
+            TimesheetEntry.submission_date,
+            TimesheetEntry.created_at
+        )
+        if start is not None:
+            stmt = stmt.where(TimesheetEntry.submission_date >= start)
+        if end is not None:
+            stmt = stmt.where(TimesheetEntry.submission_date < end)
+        if user_id:
+            stmt = stmt.where(TimesheetEntry.user_id == user_id)
+        if client_name:
+            stmt = stmt.where(TimesheetEntry.client_name == client_name)
+        return stmt.order_by(TimesheetEntry.submission_date, TimesheetEntry.id)
+    
+    @staticmethod
+    @timed_query('get_weekly_entries')
+    def get_weekly_entries(db: Session) -> List[Dict[str, Any]]:
+        start = TimesheetService.week_start()
+        entries = db.scalars(TimesheetService.entries_since_stmt(start, TimesheetService.week_end(start)))
+        return [TimesheetService.entry_to_dict(e) for e in entries]
+    
+    @staticmethod
+    @timed_query('get_monthly_entries')
+    def get_monthly_entries(db: Session) -> List[Dict[str, Any]]:
+        start = TimesheetService.month_start()
+        entries = db.scalars(TimesheetService.entries_since_stmt(start, TimesheetService.month_end(start)))
+        return [TimesheetService.entry_to_dict(e) for e in entries]
+    
+    @staticmethod
+    @timed_query('get_user_entries')
+    def get_user_entries(db: Session, user_id: str, days: int = 7) -> List[TimesheetEntry]:
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        return list(db.scalars(TimesheetService.user_entries_stmt(user_id, cutoff_date)))
+    
+    @staticmethod
+    @timed_query('get_summary')
+    def get_summary(db: Session, start: datetime, group_by: List[str], end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        # Aggregated in Postgres from the daily rollups, never from raw entries
+        stmt = TimesheetService.summary_stmt(start, group_by, end)
+        return [dict(row) for row in db.execute(stmt).mappings()]
+    
+    @staticmethod
+    @timed_query('get_period_totals')
+    def get_period_totals(db: Session, start: datetime, end: Optional[datetime] = None) -> Tuple[float, int]:
+        hours, entry_count = db.execute(TimesheetService.period_totals_stmt(start, end)).one()
+        return float(hours), int(entry_count)
+    
+    @staticmethod
+    @timed_query('get_entries_page')
+    def get_entries_page(
+        db: Session,
+        start: datetime,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        # Keyset pagination on (submission_date, id): every page is one indexed range scan
+        rows = db.execute(TimesheetService.entries_page_stmt(start, limit, after, before, end)).all()
+        return TimesheetService.build_page(rows, limit, after, before)
+    
+    @staticmethod
+    def build_page(
+        rows: List[Any],
+        limit: int,
+        after: Optional[Tuple[datetime, int]],
+        before: Optional[Tuple[datetime, int]]
+    ) -> Dict[str, Any]:
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if before is not None:
+            rows.reverse()
+        
+        return {
+            'entries': [TimesheetService.entry_to_dict(row) for row in rows],
+            'first_key': (rows[0].submission_date, rows[0].id) if rows else None,
+            'last_key': (rows[-1].submission_date, rows[-1].id) if rows else None,
+            'has_next': has_more if before is None else True,
+            'has_prev': after is not None if before is None else has_more
+        }
+    
+    @staticmethod
+    def iter_entries(
+        db: Session,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        client_name: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Any]:
+        stmt = TimesheetService.export_stmt(start, end, user_id, client_name)
+        
+        # yield_per streams from a server-side cursor, batch_size rows at a time
+        yield from db.execute(stmt.execution_options(yield_per=batch_size))
@@ -0,0 +1,119 @@
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from app.database import SessionLocal, init_db
+from app.services.timesheet_service import TimesheetService
+from app.services.partition_service import PartitionService
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import argparse
+import json
+import logging
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+INDEX_NODES = {'Index Scan', 'Index Only Scan', 'Bitmap Index Scan'}
+
+SEED_ENTRIES_SQL = """
+    INSERT INTO timesheet_entries (user_id, username, channel_id, client_name, hours, proof_url, submission_date, created_at)
+    SELECT
+        'U' || (g % :users),
+        'user' || (g % :users),
+        'C' || (g % :channels),
+        'client' || (g % :clients),
+        (g % 8) + 1,
+        NULL,
+        NOW() - (random() * :days) * INTERVAL '1 day',
+        NOW()
+    FROM generate_series(1, :rows) AS g
+"""
+
+SEED_ROLLUPS_SQL = """
+    INSERT INTO timesheet_daily_rollups (day, user_id, client_name, username, total_hours, entry_count, updated_at)
+    SELECT CAST(submission_date AS DATE), user_id, client_name, MAX(username), SUM(hours), COUNT(id), NOW()
+    FROM timesheet_entries
+    GROUP BY CAST(submission_date AS DATE), user_id, client_name
+    ON CONFLICT (day, user_id, client_name) DO NOTHING
+"""
+
+
+def _queries() -> Dict[str, Any]:
+    # Same statement builders TimesheetService executes at runtime
+    now = datetime.utcnow()
+    week_start = TimesheetService.week_start()
+    month_start = TimesheetService.month_start()
+    return {
+        'get_weekly_entries': TimesheetService.entries_since_stmt(week_start, TimesheetService.week_end(week_start)),
+        'get_monthly_entries': TimesheetService.entries_since_stmt(month_start, TimesheetService.month_end(month_start)),
+        'get_user_entries': TimesheetService.user_entries_stmt('U1', now - timedelta(days=7)),
+        'get_entries_page': TimesheetService.entries_page_stmt(week_start, 10, end=TimesheetService.week_end(week_start)),
+        'get_entries_page (next)': TimesheetService.entries_page_stmt(
+            month_start, 10, after=(month_start + timedelta(days=1), 0), end=TimesheetService.month_end(month_start)
+        ),
+        'get_summary': TimesheetService.summary_stmt(month_start, ['user', 'client'], TimesheetService.month_end(month_start)),
+        'get_period_totals': TimesheetService.period_totals_stmt(week_start, TimesheetService.week_end(week_start)),
+        'iter_entries (client)': TimesheetService.export_stmt(start=month_start, client_name='client1'),
+    }
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get('Plans', []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that TimesheetService queries use index scans")
+    parser.add_argument("--rows", type=int, default=200_000, help="Entries to seed")
+    parser.add_argument("--days", type=int, default=730, help="Spread seeded entries over this many days")
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    failures = 0
+    try:
+        # Seed inside the transaction and roll it back at the end, leaving the database untouched
+        logger.info(f"Seeding {args.rows} entries over {args.days} days")
+        PartitionService.ensure_partitions(db, (datetime.utcnow() - timedelta(days=args.days + 1)).date(), datetime.utcnow().date())
+        db.execute(text(SEED_ENTRIES_SQL), {
+            'rows': args.rows, 'days': args.days, 'users': 200, 'channels': 100, 'clients': 50
+        })
+        db.execute(text(SEED_ROLLUPS_SQL))
+        db.execute(text("ANALYZE timesheet_entries"))
+        db.execute(text("ANALYZE timesheet_daily_rollups"))
+        
+        dialect = postgresql.dialect()
+        for name, stmt in _queries().items():
+            compiled = stmt.compile(dialect=dialect)
+            result = db.connection().exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + compiled.string,
+                compiled.params
+            ).scalar()
+            plan = (json.loads(result) if isinstance(result, str) else result)[0]['Plan']
+            
+            nodes = _plan_nodes(plan)
+            node_types = sorted({node['Node Type'] for node in nodes})
+            seq_scans = [node.get('Relation Name') for node in nodes if node['Node Type'] == 'Seq Scan']
+            uses_index = any(node['Node Type'] in INDEX_NODES for node in nodes)
+            
+            ok = uses_index and not seq_scans
+            failures += not ok
+            indexes = sorted({node['Index Name'] for node in nodes if 'Index Name' in node})
+            logger.info(f"{'PASS' if ok else 'FAIL'} {name}: {', '.join(node_types)} {indexes or ''}")
+    finally:
+        db.rollback()
+        db.close()
+    
+    if failures:
+        logger.error(f"{failures} queries did not use an index scan")
+        sys.exit(1)
+    logger.info("All queries use index scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+from sqlalchemy import text
+from app.database import engine, init_db
+from app.services.timesheet_service import TimesheetService
+from app.services.report_cache import report_cache
+from app.services.partition_service import PartitionService
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import csv
+import io
+import json
+import logging
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STAGING_COLUMNS = [
+    'user_id', 'username', 'channel_id', 'client_name', 'hours',
+    'proof_url', 'submission_date', 'created_at', 'idempotency_key'
+]
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE import_staging (
+        user_id VARCHAR(50) NOT NULL,
+        username VARCHAR(100) NOT NULL,
+        channel_id VARCHAR(50) NOT NULL,
+        client_name VARCHAR(200) NOT NULL,
+        hours DOUBLE PRECISION NOT NULL,
+        proof_url TEXT,
+        submission_date TIMESTAMP NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        idempotency_key VARCHAR(128) NOT NULL
+    ) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# One statement merges the staged rows into entries and keeps the rollups and channel
+# registry in step. Rows already imported (same source and line) fail to claim their
+# idempotency key and are skipped, so a failed or repeated import can simply be re-run.
+# Channels first seen here are registered inactive: the bot may not be a member.
+MERGE_SQL = """
+    WITH claimed AS (
+        INSERT INTO timesheet_entry_keys (idempotency_key, created_at)
+        SELECT idempotency_key, NOW() FROM import_staging
+        ON CONFLICT (idempotency_key) DO NOTHING
+        RETURNING idempotency_key
+    ),
+    inserted AS (
+        INSERT INTO timesheet_entries (user_id, username, channel_id, client_name, hours, proof_url, submission_date, created_at, idempotency_key)
+        SELECT s.user_id, s.username, s.channel_id, s.client_name, s.hours, s.proof_url, s.submission_date, s.created_at, s.idempotency_key
+        FROM import_staging s
+        JOIN claimed USING (idempotency_key)
+        ORDER BY s.submission_date
+        RETURNING user_id, username, channel_id, client_name, hours, submission_date
+    ),
+    rollups AS (
+        INSERT INTO timesheet_daily_rollups AS r (day, user_id, client_name, username, total_hours, entry_count, updated_at)
+        SELECT CAST(submission_date AS DATE), user_id, client_name, MAX(username), SUM(hours), COUNT(*), NOW()
+        FROM inserted
+        GROUP BY CAST(submission_date AS DATE), user_id, client_name
+        ON CONFLICT (day, user_id, client_name) DO UPDATE SET
+            username = EXCLUDED.username,
+            total_hours = r.total_hours + EXCLUDED.total_hours,
+            entry_count = r.entry_count + EXCLUDED.entry_count,
+            updated_at = EXCLUDED.updated_at
+    ),
+    channels AS (
+        INSERT INTO channels AS c (channel_id, is_active, is_archived, last_submission_at, created_at, updated_at)
+        SELECT channel_id, FALSE, FALSE, MAX(submission_date), NOW(), NOW()
+        FROM inserted
+        WHERE channel_id <> 'unknown'
+        GROUP BY channel_id
+        ON CONFLICT (channel_id) DO UPDATE SET
+            last_submission_at = GREATEST(c.last_submission_at, EXCLUDED.last_submission_at),
+            updated_at = EXCLUDED.updated_at
+    )
+    SELECT COUNT(*) FROM inserted
+"""
+
+
+def _read_rows(stream: TextIO, file_format: str) -> Iterator[Tuple[int, Any]]:
+    # Yields (line number, row dict or the parse error) one row at a time
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for line_num, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                yield line_num, row if isinstance(row, dict) else ValueError("row is not a JSON object")
+            except ValueError as e:
+                yield line_num, e
+
+
+def _parse_datetime(value: Any, field: str, default: Optional[datetime] = None) -> datetime:
+    if value in (None, ''):
+        if default is None:
+            raise ValueError(f"{field} is required")
+        return default
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"{field} is not an ISO date/time: {value!r}")
+    # Entries are stored as naive UTC, like datetime.utcnow() on the request path; naive
+    # input is taken to be UTC already
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _required(row: Dict[str, Any], field: str, max_length: int, default: Optional[str] = None) -> str:
+    value = str(row.get(field) or '').strip() or default
+    if not value:
+        raise ValueError(f"{field} is required")
+    if len(value) > max_length:
+        raise ValueError(f"{field} is longer than {max_length} characters")
+    return value
+
+
+def _validate(row: Dict[str, Any], channel_id: str, now: datetime) -> List[Any]:
+    # JSON rows may carry numbers or other types where the form only ever sends strings
+    entry = TimesheetService.validate_entry({
+        'client_name': str(row.get('client_name') or ''),
+        'hours': row.get('hours'),
+        'proof_url': str(row['proof_url']) if row.get('proof_url') else None
+    })
+    user_id = _required(row, 'user_id', 50)
+    return [
+        user_id,
+        _required(row, 'username', 100, default=user_id),
+        _required(row, 'channel_id', 50, default=channel_id),
+        entry['client_name'],
+        entry['hours'],
+        entry['proof_url'] or None,
+        _parse_datetime(row.get('submission_date'), 'submission_date'),
+        _parse_datetime(row.get('created_at'), 'created_at', default=now),
+    ]
+
+
+class ImportStats:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.read = 0
+        self.staged = 0
+        self.rejected = 0
+        self.inserted = 0
+
+    def rate(self) -> float:
+        return self.read / max(time.monotonic() - self.started_at, 1e-9)
+
+
+def import_file(
+    path: Path,
+    file_format: str,
+    source: str,
+    channel_id: str,
+    chunk_size: int,
+    rejects: Optional[TextIO] = None
+) -> ImportStats:
+    stats = ImportStats()
+    now = datetime.utcnow()
+
+    # A single transaction: the staging table and the merge commit or roll back together
+    with engine.begin() as conn, path.open(newline='', encoding='utf-8') as stream:
+        conn.execute(text(CREATE_STAGING_SQL))
+        cursor = conn.connection.dbapi_connection.cursor()
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+
+        def flush():
+            # COPY one chunk, then reuse the buffer so memory stays flat however big the file is
+            nonlocal pending
+            buffer.seek(0)
+            cursor.copy_expert(COPY_SQL, buffer)
+            stats.staged += pending
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+            logger.info(f"Read {stats.read} rows ({stats.rejected} rejected), {stats.rate():.0f} rows/s")
+
+        for line_num, row in _read_rows(stream, file_format):
+            stats.read += 1
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                values = _validate(row, channel_id, now)
+            except ValueError as e:
+                stats.rejected += 1
+                if rejects is not None:
+                    rejects.write(json.dumps({'line': line_num, 'error': str(e), 'row': row if isinstance(row, dict) else None}) + "\n")
+                elif stats.rejected <= 20:
+                    logger.warning(f"Line {line_num} rejected: {e}")
+                continue
+
+            writer.writerow(values + [f"import:{source}:{line_num}"])
+            pending += 1
+            if pending >= chunk_size:
+                flush()
+        if pending:
+            flush()
+
+        logger.info(f"Merging {stats.staged} staged rows")
+        conn.execute(text("ANALYZE import_staging"))
+        oldest, newest = conn.execute(text("SELECT MIN(submission_date), MAX(submission_date) FROM import_staging")).one()
+        if oldest is not None:
+            # Historical months need their partitions before rows can be routed to them.
+            # Created and committed on a separate connection: CREATE TABLE ... PARTITION OF
+            # locks timesheet_entries exclusively, which must not last as long as the merge.
+            with engine.begin() as ddl:
+                PartitionService.ensure_partitions(ddl, oldest.date(), newest.date())
+        stats.inserted = conn.execute(text(MERGE_SQL)).scalar()
+
+        notify = report_cache.notify_all_stmt()
+        if notify is not None:
+            conn.execute(notify)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import timesheet entries from CSV or NDJSON",
+        epilog="submission_date and created_at are ISO 8601. Values with an offset are converted "
+               "to UTC; values without one are taken to be UTC already."
+    )
+    parser.add_argument("path", type=Path, help="CSV (with header) or NDJSON file")
+    parser.add_argument("--format", choices=['csv', 'ndjson'], help="Defaults to the file extension")
+    parser.add_argument("--source", help="Name recorded in idempotency keys (defaults to the file name); re-running the same source skips rows already imported")
+    parser.add_argument("--channel", default="unknown", help="channel_id for rows that have none")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows validated and copied per chunk")
+    parser.add_argument("--rejects", type=Path, help="Write rejected rows as NDJSON to this file")
+    args = parser.parse_args()
+
+    file_format = args.format or ('csv' if args.path.suffix.lower() == '.csv' else 'ndjson')
+    source = (args.source or args.path.name)[:80]
+
+    init_db()
+    rejects = args.rejects.open('w', encoding='utf-8') if args.rejects else None
+    try:
+        stats = import_file(args.path, file_format, source, args.channel, args.chunk_size, rejects)
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+    elapsed = time.monotonic() - stats.started_at
+    logger.info(
+        f"Imported {stats.inserted} new entries from {stats.read} rows in {elapsed:.2f}s "
+        f"({stats.rate():.0f} rows/s); {stats.rejected} rejected, "
+        f"{stats.staged - stats.inserted} already imported"
+    )
+
+
+if __name__ == "__main__":
+    main()
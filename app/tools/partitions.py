@@ -0,0 +1,51 @@
+from app.database import SessionLocal, init_db
+from app.services.partition_service import PartitionService
+from app.config import get_settings
+from pathlib import Path
+import argparse
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage monthly timesheet_entries partitions and their archives")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List attached partitions")
+    premake = commands.add_parser("premake", help="Create partitions ahead of time")
+    premake.add_argument("--months", type=int, default=settings.partition_premake_months)
+    archive = commands.add_parser("archive", help="Detach a partition and write it to a gzip archive")
+    archive.add_argument("partition", help="e.g. timesheet_entries_y2024m01")
+    archive.add_argument("--dir", type=Path, default=settings.partition_archive_dir or None, help="Defaults to PARTITION_ARCHIVE_DIR")
+    restore = commands.add_parser("restore", help="Load an archive back into its monthly partition")
+    restore.add_argument("path", type=Path, help="e.g. /var/lib/timesheet/archives/timesheet_entries_y2024m01.csv.gz")
+    args = parser.parse_args()
+    if args.command == "archive" and args.dir is None:
+        parser.error("archive needs --dir or PARTITION_ARCHIVE_DIR")
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "list":
+            for name, month in PartitionService.list_partitions(db):
+                logger.info(f"{name} ({month:%Y-%m})")
+        elif args.command == "premake":
+            created = PartitionService.premake(db, args.months)
+            logger.info(f"Created {len(created)} partitions")
+        elif args.command == "archive":
+            path = PartitionService.archive_partition(db, args.partition, args.dir)
+            logger.info(f"Archived to {path}")
+        elif args.command == "restore":
+            name = PartitionService.restore_partition(db, args.path)
+            logger.info(f"Restored into {name}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from app.database import SessionLocal, init_db
+from app.services.rollup_service import RollupService
+from datetime import date
+import argparse
+import logging
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily timesheet rollups from raw entries. Months whose partition has been archived keep their rollups.")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        started_at = time.monotonic()
+        rows = RollupService.rebuild(db, args.start, args.end)
+        logger.info(f"Rebuilt {rows} rollup rows in {time.monotonic() - started_at:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,46 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import orjson
+
+# Slack rejects messages with more than 50 blocks or sections over 3000 characters
+MAX_BLOCKS = 50
+MAX_SECTION_CHARS = 2900
+
+MAX_ENTRY_FORMS = 5
 
 
 class BlockBuilder:
+    # Ready-to-send response bodies for the static forms, filled by precompute()
+    _initial_form_response: Optional[bytes] = None
+    _entry_forms_responses: Dict[int, bytes] = {}
+    
+    @classmethod
+    def precompute(cls):
+        cls._initial_form_response = orjson.dumps({
+            "response_type": "ephemeral",
+            "blocks": cls.build_initial_form(),
+            "text": "Fill your timesheet"
+        })
+        cls._entry_forms_responses = {
+            num_entries: orjson.dumps({
+                "blocks": cls.build_entry_forms(num_entries),
+                "replace_original": "true",  # String, not boolean for JSON
+                "response_type": "ephemeral"
+            })
+            for num_entries in range(1, MAX_ENTRY_FORMS + 1)
+        }
+    
+    @classmethod
+    def initial_form_response(cls) -> bytes:
+        if cls._initial_form_response is None:
+            cls.precompute()
+        return cls._initial_form_response
+    
+    @classmethod
+    def entry_forms_response(cls, num_entries: int) -> bytes:
+        if not cls._entry_forms_responses:
+            cls.precompute()
+        return cls._entry_forms_responses[max(1, min(num_entries, MAX_ENTRY_FORMS))]
+    
     @staticmethod
     def build_initial_form() -> List[Dict[str, Any]]:
         return [
@@ -27,7 +66,7 @@ class BlockBuilder:
                     },
                     "options": [
                         {"text": {"type": "plain_text", "text": f"{i}"}, "value": str(i)}
-                        for i in range(1, 6)
+                        for i in range(1, MAX_ENTRY_FORMS + 1)
                     ]
                 },
                 "label": {
@@ -146,7 +185,13 @@ class BlockBuilder:
         return blocks
     
     @staticmethod
-    def build_report_blocks(entries: List[Dict[str, Any]], title: str) -> List[Dict[str, Any]]:
+    def build_report_blocks(
+        entries: List[Dict[str, Any]],
+        title: str,
+        total_hours: Optional[float] = None,
+        prev_cursor: Optional[str] = None,
+        next_cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         blocks = [
             {
                 "type": "header",
@@ -206,7 +251,8 @@ class BlockBuilder:
                 }
             ])
         
-        total_hours = sum(entry['hours'] for entry in entries)
+        if total_hours is None:
+            total_hours = sum(entry['hours'] for entry in entries)
         blocks.append({
             "type": "section",
             "text": {
@@ -215,4 +261,100 @@ class BlockBuilder:
             }
         })
         
-        return blocks
\ No newline at end of file
+        # Paging buttons carry the keyset cursor for the neighbouring page
+        buttons = []
+        if prev_cursor:
+            buttons.append({
+                "type": "button",
+                "text": {"type": "plain_text", "text": "◀ Previous"},
+                "action_id": "report_page_prev",
+                "value": prev_cursor
+            })
+        if next_cursor:
+            buttons.append({
+                "type": "button",
+                "text": {"type": "plain_text", "text": "Next ▶"},
+                "action_id": "report_page_next",
+                "value": next_cursor
+            })
+        if buttons:
+            blocks.append({"type": "actions", "elements": buttons})
+        
+        return blocks
+    
+    @staticmethod
+    def build_summary_blocks(rows: List[Dict[str, Any]], title: str, group_by: List[str]) -> List[Dict[str, Any]]:
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": title
+                }
+            },
+            {
+                "type": "context",
+                "elements": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"Summary by {', '.join(group_by)}"
+                    }
+                ]
+            },
+            {
+                "type": "divider"
+            }
+        ]
+        
+        if not rows:
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "_No timesheet entries found for this period._"
+                }
+            })
+            return blocks
+        
+        lines = []
+        for row in rows:
+            labels = []
+            if 'user' in group_by:
+                labels.append(f"*{row['username']}*")
+            if 'client' in group_by:
+                labels.append(row['client_name'])
+            lines.append(f"• {' · '.join(labels)} — {row['hours']:g}h ({row['entry_count']} entries)")
+        
+        # Pack lines into as few sections as possible, leaving room for the footer
+        max_sections = MAX_BLOCKS - len(blocks) - 2
+        chunk = ""
+        shown = 0
+        for line in lines:
+            if len(chunk) + len(line) + 1 > MAX_SECTION_CHARS:
+                if max_sections == 1:
+                    break
+                blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": chunk}})
+                max_sections -= 1
+                chunk = ""
+            chunk += line + "\n"
+            shown += 1
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": chunk}})
+        
+        if shown < len(lines):
+            blocks.append({
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"_…and {len(lines) - shown} more rows_"}]
+            })
+        
+        total_hours = sum(row['hours'] for row in rows)
+        total_entries = sum(row['entry_count'] for row in rows)
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*Total Hours:* {total_hours:g} across {total_entries} entries"
+            }
+        })
+        
+        return blocks
+
@@ -0,0 +1,82 @@
+from sqlalchemy import text
+from app.database import engine, async_engine
+from app.config import get_settings
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _select_one():
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def _async_select_one():
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def _pool_usage(pool: Any) -> Dict[str, Any]:
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    in_use = pool.checkedout()
+    return {
+        "in_use": in_use,
+        "capacity": capacity,
+        "saturation": round(in_use / capacity, 3) if capacity else 0.0
+    }
+
+
+class ReadinessProbe:
+    def __init__(self, scheduler: Any, ttl: float):
+        self.scheduler = scheduler
+        self.ttl = ttl
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def check(self) -> Dict[str, Any]:
+        # Probes inside the TTL share one result, so probe traffic never piles onto the database
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+        
+        async with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._result = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._result
+    
+    async def _check_database(self) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        try:
+            if async_engine is not None:
+                await asyncio.wait_for(_async_select_one(), timeout=settings.health_db_timeout)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(_select_one), timeout=settings.health_db_timeout)
+        except Exception as e:
+            logger.warning(f"Readiness database check failed: {str(e) or type(e).__name__}")
+            return {"ok": False, "error": str(e) or type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started_at) * 1000, 1)}
+    
+    async def _run_checks(self) -> Dict[str, Any]:
+        database = await self._check_database()
+        
+        pools = {"sync": _pool_usage(engine.pool)}
+        if async_engine is not None:
+            pools["async"] = _pool_usage(async_engine.sync_engine.pool)
+        pool_ok = all(usage["saturation"] < settings.ready_pool_saturation for usage in pools.values())
+        
+        scheduler_ok = bool(self.scheduler.scheduler.running)
+        
+        ready = database["ok"] and pool_ok and scheduler_ok
+        return {
+            "status": "ready" if ready else "not_ready",
+            "checks": {
+                "database": database,
+                "pool": {"ok": pool_ok, **pools},
+                "scheduler": {"ok": scheduler_ok, "leader": self.scheduler.is_leader}
+            }
+        }
@@ -0,0 +1,65 @@
+from fastapi import Request
+from app.utils.ttl_cache import TTLCache
+from app.utils.metrics import IDEMPOTENT_REPLAYS
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _cacheable(result: Any) -> bool:
+    # Failed attempts are not remembered so the user can simply try again
+    return not (isinstance(result, dict) and 'errors' in result)
+
+
+class IdempotencyCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self._results = TTLCache(maxsize, ttl)
+        self._pending: Dict[str, asyncio.Future] = {}
+    
+    async def run(self, key: Optional[str], func: Callable[[], Awaitable[Any]]) -> Any:
+        if key is None:
+            return await func()
+        
+        cached = self._results.get(key)
+        if cached is not None:
+            IDEMPOTENT_REPLAYS.labels(state='completed').inc()
+            logger.info(f"🔁 Duplicate request {key}, replaying first response")
+            return cached
+        
+        # A duplicate arriving while the first is still running waits for its result
+        pending = self._pending.get(key)
+        if pending is not None:
+            IDEMPOTENT_REPLAYS.labels(state='in_flight').inc()
+            logger.info(f"🔁 Duplicate request {key} while in flight, waiting for first response")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The first request was cancelled before finishing, so this one takes over
+                return await self.run(key, func)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            if _cacheable(result):
+                self._results.set(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            # Cancellation is a BaseException; don't leave duplicates waiting on it forever
+            if not future.done():
+                future.cancel()
+            self._pending.pop(key, None)
+
+
+def get_idempotency_cache(request: Request) -> IdempotencyCache:
+    return request.app.state.idempotency_cache
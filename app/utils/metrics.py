@@ -0,0 +1,136 @@
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from functools import wraps
+from typing import Any, Callable
+import inspect
+import time
+
+REQUEST_LATENCY = Histogram(
+    'slack_request_duration_seconds',
+    'Latency of Slack-facing HTTP routes',
+    ['route', 'status']
+)
+SLACK_API_LATENCY = Histogram(
+    'slack_api_call_duration_seconds',
+    'Latency of individual Slack Web API calls',
+    ['method']
+)
+SLACK_API_ERRORS = Counter(
+    'slack_api_errors_total',
+    'Slack Web API calls that failed',
+    ['method', 'error']
+)
+SLACK_API_RATE_LIMITED = Counter(
+    'slack_api_rate_limited_total',
+    'Slack Web API calls answered with HTTP 429',
+    ['method']
+)
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds',
+    'Time spent in TimesheetService queries',
+    ['query']
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting for a connection from the SQLAlchemy pool',
+    ['engine'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+DB_POOL_IN_USE = Gauge(
+    'db_pool_connections_in_use',
+    'Connections currently checked out of the SQLAlchemy pool',
+    ['engine']
+)
+DB_POOL_SIZE = Gauge(
+    'db_pool_size',
+    'Configured SQLAlchemy pool size',
+    ['engine']
+)
+JOB_DURATION = Histogram(
+    'scheduler_job_duration_seconds',
+    'Duration of scheduled job runs',
+    ['job']
+)
+JOB_LAST_RUN = Gauge(
+    'scheduler_job_last_run_timestamp_seconds',
+    'Unix time a scheduled job last finished',
+    ['job', 'status']
+)
+TASK_QUEUE_WAIT = Histogram(
+    'background_task_queue_wait_seconds',
+    'Time background tasks spent queued before a worker picked them up'
+)
+TASK_DURATION = Histogram(
+    'background_task_duration_seconds',
+    'Run time of background tasks'
+)
+TASK_QUEUE_DEPTH = Gauge(
+    'background_task_queue_depth',
+    'Tasks waiting in the background pool'
+)
+TASKS_IN_FLIGHT = Gauge(
+    'background_tasks_in_flight',
+    'Background tasks currently running'
+)
+OUTBOX_MESSAGES = Counter(
+    'outbox_messages_total',
+    'Outbound Slack messages processed by the outbox drainer',
+    ['status']
+)
+IDEMPOTENT_REPLAYS = Counter(
+    'slack_idempotent_replays_total',
+    'Duplicate Slack deliveries answered from the first response',
+    ['state']
+)
+
+
+def timed_query(name: str) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                started_at = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    DB_QUERY_LATENCY.labels(name).observe(time.perf_counter() - started_at)
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                DB_QUERY_LATENCY.labels(name).observe(time.perf_counter() - started_at)
+        return wrapper
+    return decorator
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels('sync').observe(time.perf_counter() - started_at)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels('async').observe(time.perf_counter() - started_at)
+
+
+def track_pool(engine: Any, label: str):
+    pool = engine.pool
+    DB_POOL_IN_USE.labels(label).set_function(pool.checkedout)
+    DB_POOL_SIZE.labels(label).set_function(pool.size)
+
+
+def track_task_pool(task_pool: Any):
+    TASK_QUEUE_DEPTH.set_function(lambda: task_pool.stats()['queue_depth'])
+    TASKS_IN_FLIGHT.set_function(lambda: task_pool.in_flight)
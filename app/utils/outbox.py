@@ -0,0 +1,113 @@
+from slack_sdk.errors import SlackApiError
+from app.database import SessionLocal, run_db, session_scope
+from app.services.outbox_service import OutboxService
+from app.services.slack_service import SlackService, TRANSIENT_ERRORS, _error_message, _retry_after
+from app.utils.metrics import OUTBOX_MESSAGES
+from app.config import get_settings
+from typing import Any, Callable, Dict, List
+import asyncio
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Errors a retry cannot fix; these messages are marked failed straight away
+PERMANENT_ERRORS = {
+    'channel_not_found', 'not_in_channel', 'is_archived', 'user_not_found',
+    'user_disabled', 'message_not_found', 'cant_update_message', 'invalid_blocks'
+}
+
+
+class OutboxDrainer:
+    def __init__(self, slack_service: SlackService, workers: int, batch_size: int):
+        self.slack_service = slack_service
+        self.workers = workers
+        self.batch_size = batch_size
+        self._worker_tasks: List[asyncio.Task] = []
+    
+    async def start(self):
+        if self._worker_tasks:
+            return
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"outbox-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Outbox drainer started with {self.workers} workers")
+    
+    async def stop(self):
+        # Anything claimed but not sent goes back to pending when its lease runs out
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        logger.info("Outbox drainer stopped")
+    
+    async def _worker(self, worker_id: int):
+        while True:
+            try:
+                batch = await self._run(OutboxService.claim_batch, self.batch_size, settings.outbox_lease_seconds)
+                if not batch:
+                    await asyncio.sleep(settings.outbox_poll_interval)
+                    continue
+                
+                results = await asyncio.gather(*(self._deliver(message) for message in batch), return_exceptions=True)
+                for message, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Outbound message {message['id']} not recorded: {str(result)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox worker {worker_id} failed: {str(e)}", exc_info=True)
+                await asyncio.sleep(settings.outbox_poll_interval)
+    
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        if settings.db_async:
+            async with session_scope() as db:
+                return await run_db(db, func, *args)
+        # Off the event loop, like TaskScheduler._with_session, so polling never blocks requests
+        return await asyncio.to_thread(self._with_session, func, *args)
+    
+    @staticmethod
+    def _with_session(func: Callable, *args: Any) -> Any:
+        db = SessionLocal()
+        try:
+            return func(db, *args)
+        finally:
+            db.close()
+    
+    async def _deliver(self, message: Dict[str, Any]):
+        try:
+            await self.slack_service.deliver(message['kind'], message['target'], message['payload'])
+        except Exception as e:
+            # Anything else (a malformed payload, say) still counts towards outbox_max_attempts,
+            # rather than escaping and being re-claimed after every lease forever
+            await self._failed(message, e)
+            return
+        
+        await self._run(OutboxService.mark_sent, [message['id']])
+        OUTBOX_MESSAGES.labels('sent').inc()
+    
+    async def _failed(self, message: Dict[str, Any], error: Exception):
+        if isinstance(error, (SlackApiError, *TRANSIENT_ERRORS)):
+            reason = _error_message(error)
+        else:
+            reason = f"{type(error).__name__}: {error}"
+        permanent = isinstance(error, SlackApiError) and reason in PERMANENT_ERRORS
+        
+        if permanent or message['attempts'] >= settings.outbox_max_attempts:
+            await self._run(OutboxService.mark_failed, message['id'], reason)
+            OUTBOX_MESSAGES.labels('failed').inc()
+            logger.error(f"Outbound {message['kind']} to {message['target']} failed for good: {reason}")
+            return
+        
+        retry_after = _retry_after(error) if isinstance(error, SlackApiError) else None
+        delay = retry_after if retry_after is not None else self._backoff(message['attempts'])
+        await self._run(OutboxService.mark_retry, message['id'], reason, delay)
+        OUTBOX_MESSAGES.labels('retried').inc()
+        logger.warning(f"Outbound {message['kind']} to {message['target']} failed ({reason}), retrying in {delay:.0f}s")
+    
+    @staticmethod
+    def _backoff(attempts: int) -> float:
+        delay = min(settings.outbox_retry_max_delay, settings.outbox_retry_base_delay * (2 ** attempts))
+        return delay * random.uniform(0.5, 1.0)
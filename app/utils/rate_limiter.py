@@ -0,0 +1,92 @@
+from typing import Dict, Tuple
+import asyncio
+import time
+
+# Requests per minute for each of Slack's Web API rate limit tiers
+SLACK_TIER_RATES = {
+    1: 1,
+    2: 20,
+    3: 50,
+    4: 100
+}
+
+METHOD_TIERS = {
+    "chat.update": 3,
+    "conversations.open": 3,
+    "conversations.members": 4,
+    "files.info": 4,
+    "users.info": 4,
+    "users.list": 2
+}
+
+DEFAULT_TIER = 3
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, burst: float):
+        self.base_rate = rate_per_minute / 60
+        self.rate = self.base_rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    def penalize(self, retry_after: float):
+        # Stop sending until Slack's Retry-After passes and halve the rate afterwards
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.tokens = 0.0
+        self.updated_at = max(now, self.blocked_until)
+        self.rate = max(self.base_rate / 8, self.rate / 2)
+    
+    def reward(self):
+        # Creep back towards the configured rate while calls keep succeeding
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+
+class SlackRateLimiter:
+    def __init__(self, overrides: Dict[str, Tuple[float, float]] = None):
+        self._overrides = overrides or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+    
+    def bucket(self, method: str) -> TokenBucket:
+        bucket = self._buckets.get(method)
+        if bucket is None:
+            if method in self._overrides:
+                rate_per_minute, burst = self._overrides[method]
+            else:
+                rate_per_minute = SLACK_TIER_RATES[METHOD_TIERS.get(method, DEFAULT_TIER)]
+                burst = rate_per_minute / 10
+            bucket = TokenBucket(rate_per_minute, burst)
+            self._buckets[method] = bucket
+        return bucket
+    
+    async def acquire(self, method: str):
+        await self.bucket(method).acquire()
+    
+    def penalize(self, method: str, retry_after: float):
+        self.bucket(method).penalize(retry_after)
+    
+    def reward(self, method: str):
+        self.bucket(method).reward()
@@ -0,0 +1,13 @@
+from fastapi.responses import ORJSONResponse, Response
+from typing import Any, Dict, Union
+
+
+class PreSerializedJSONResponse(Response):
+    # Body is already JSON bytes (see BlockBuilder.precompute), so rendering is a no-op
+    media_type = "application/json"
+
+
+def slack_response(content: Union[bytes, Dict[str, Any]], status_code: int = 200) -> Response:
+    if isinstance(content, bytes):
+        return PreSerializedJSONResponse(content=content, status_code=status_code)
+    return ORJSONResponse(content=content, status_code=status_code)
@@ -1,107 +1,275 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
 from app.services.slack_service import SlackService
+from app.services.channel_service import ChannelService
+from app.services.job_run_service import JobRunService
+from app.services.outbox_service import OutboxService
+from app.services.partition_service import PartitionService
 from app.database import SessionLocal
-from sqlalchemy import text
+from app.utils.metrics import JOB_DURATION, JOB_LAST_RUN
+from app.config import get_settings
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
 import logging
+import os
+import socket
+import time
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Session-level advisory lock held by the leader; it is released by Postgres as soon
+# as the leader's connection goes away, which is what lets another process take over
+SCHEDULER_LOCK_ID = 7_215_002
+
+Job = Callable[[], Awaitable[None]]
+
+
+def last_fire_time(trigger: CronTrigger, now: datetime, window: float) -> Optional[datetime]:
+    # Most recent occurrence in (now - window, now], if any
+    last = None
+    fire = trigger.get_next_fire_time(None, now - timedelta(seconds=window))
+    while fire is not None and fire <= now:
+        last = fire
+        fire = trigger.get_next_fire_time(fire, fire + timedelta(seconds=1))
+    return last
 
 
 class TaskScheduler:
-    def __init__(self):
+    def __init__(self, slack_service: SlackService):
         self.scheduler = AsyncIOScheduler()
-        self.slack_service = SlackService()
+        self.slack_service = slack_service
+        self.is_leader = False
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: Dict[str, Tuple[CronTrigger, Job]] = {}
+        # The lock connection lives outside the request pool so it never competes for a slot
+        self._lock_engine = create_engine(settings.database_url, poolclass=NullPool)
+        self._lock_conn = None
+        self._election_task: Optional[asyncio.Task] = None
+        self._lock_op: Optional[asyncio.Future] = None
     
     def start(self):
         # Weekly reminder every Friday at 10 AM
-        self.scheduler.add_job(
-            self.send_weekly_reminder,
-            CronTrigger(day_of_week='fri', hour=10, minute=0),
-            id='weekly_reminder'
-        )
+        self._add_job('weekly_reminder', self.send_weekly_reminder, CronTrigger(day_of_week='fri', hour=10, minute=0))
         
         # Monthly report on last day of month at 5 PM
-        self.scheduler.add_job(
-            self.send_monthly_summary,
-            CronTrigger(day='last', hour=17, minute=0),
-            id='monthly_summary'
-        )
+        self._add_job('monthly_summary', self.send_monthly_summary, CronTrigger(day='last', hour=17, minute=0))
+        
+        # Partitions ahead of time and retention, nightly at 3 AM
+        self._add_job('partition_maintenance', self.maintain_partitions, CronTrigger(hour=3, minute=0))
         
-        self.scheduler.start()
-        logger.info("Scheduler started")
+        # Every process runs the scheduler, but jobs only fire in the elected leader
+        self.scheduler.start(paused=True)
+        self._election_task = asyncio.create_task(self._elect())
+        logger.info(f"Scheduler started as {self.worker_id}, waiting for leadership")
     
-    def stop(self):
-        self.scheduler.shutdown()
-        logger.info("Scheduler stopped")
+    def _add_job(self, job_id: str, job: Job, trigger: CronTrigger):
+        self._jobs[job_id] = (trigger, job)
+        self.scheduler.add_job(self._run_scheduled, trigger, args=[job_id], id=job_id)
     
-    async def send_weekly_reminder(self):
-        try:
-            db = SessionLocal()
+    async def _elect(self):
+        while True:
+            try:
+                held = await self._on_lock_thread(self._hold_lock)
+            except SQLAlchemyError as e:
+                logger.error(f"Scheduler leader election failed: {str(e)}")
+                await self._on_lock_thread(self._release_lock)
+                held = False
             
-            # Get all channels where bot is present
-            result = db.execute(text("SELECT DISTINCT channel_id FROM timesheet_entries"))
-            channels = [row[0] for row in result]
-            
-            reminder_blocks = [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "⏰ *Weekly Timesheet Reminder*\n\nDon't forget to fill your timesheet for this week!\nUse `/timesheet` command to submit."
-                    }
-                },
-                {
-                    "type": "actions",
-                    "elements": [
-                        {
-                            "type": "button",
-                            "text": {"type": "plain_text", "text": "Fill Timesheet"},
-                            "action_id": "open_timesheet_modal",
-                            "style": "primary"
-                        }
-                    ]
-                }
-            ]
+            try:
+                if held and not self.is_leader:
+                    await self._become_leader()
+                elif not held and self.is_leader:
+                    self._step_down()
+            except Exception as e:
+                # Keep electing; an election task that dies would leave is_leader stale
+                logger.error(f"Scheduler leadership change failed: {str(e)}", exc_info=True)
             
-            for channel in channels:
-                self.slack_service.post_message(
-                    channel,
-                    reminder_blocks,
-                    "Time to fill your timesheet!"
-                )
-            
-            db.close()
-            logger.info(f"Weekly reminder sent to {len(channels)} channels")
+            await asyncio.sleep(settings.scheduler_leader_poll)
+    
+    async def _on_lock_thread(self, func: Callable[[], Any]) -> Any:
+        # Shielded, so cancelling the election can't leave a thread still using the lock
+        # connection while stop() closes it; stop() waits on _lock_op instead
+        self._lock_op = asyncio.ensure_future(asyncio.to_thread(func))
+        return await asyncio.shield(self._lock_op)
+    
+    def _hold_lock(self) -> bool:
+        # Followers try to take the lock; the leader just proves its connection is alive
+        if self._lock_conn is None:
+            self._lock_conn = self._lock_engine.connect()
+        elif self.is_leader:
+            self._lock_conn.execute(text("SELECT 1"))
+            self._lock_conn.commit()
+            return True
+        acquired = self._lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": SCHEDULER_LOCK_ID}).scalar()
+        self._lock_conn.commit()
+        return bool(acquired)
+    
+    def _release_lock(self):
+        # Closing the session releases the advisory lock with it
+        if self._lock_conn is not None:
+            try:
+                self._lock_conn.close()
+            except SQLAlchemyError:
+                pass
+            self._lock_conn = None
+    
+    async def _become_leader(self):
+        self.is_leader = True
+        logger.info(f"Scheduler leadership acquired by {self.worker_id}")
+        self.scheduler.resume()
+        await self._catch_up()
+    
+    def _step_down(self):
+        self.is_leader = False
+        self.scheduler.pause()
+        logger.warning(f"Scheduler leadership lost by {self.worker_id}")
+    
+    async def _catch_up(self):
+        # Occurrences missed while no process was leading run now, once
+        for job_id, (trigger, _) in self._jobs.items():
+            now = datetime.now(trigger.timezone)
+            due = last_fire_time(trigger, now, settings.scheduler_catchup_window)
+            if due is None:
+                continue
+            try:
+                await self._run_once(job_id, due)
+            except Exception as e:
+                # Claiming or recording the run failed; the next leader or occurrence retries it
+                logger.error(f"Catch-up of {job_id} for {due.isoformat()} failed: {str(e)}", exc_info=True)
+    
+    async def _run_scheduled(self, job_id: str):
+        trigger, _ = self._jobs[job_id]
+        now = datetime.now(trigger.timezone)
+        await self._run_once(job_id, last_fire_time(trigger, now, settings.scheduler_catchup_window) or now)
+    
+    async def _run_once(self, job_id: str, scheduled_for: datetime):
+        if not self.is_leader:
+            return
         
+        claimed = await asyncio.to_thread(self._with_session, JobRunService.claim, job_id, scheduled_for,
+                                          self.worker_id, settings.scheduler_stale_run_after)
+        if not claimed:
+            logger.info(f"Job {job_id} for {scheduled_for.isoformat()} already ran, skipping")
+            return
+        
+        status = 'success'
+        try:
+            await self._instrument(job_id, self._jobs[job_id][1])()
         except Exception as e:
-            logger.error(f"Error sending weekly reminder: {str(e)}")
+            status = 'error'
+            logger.error(f"Job {job_id} failed: {str(e)}")
+        finally:
+            await asyncio.to_thread(self._with_session, JobRunService.finish, job_id, scheduled_for, status)
     
-    async def send_monthly_summary(self):
+    @staticmethod
+    def _with_session(func: Callable, *args):
+        db = SessionLocal()
         try:
-            from app.services.timesheet_service import TimesheetService
-            from app.utils.block_builder import BlockBuilder
-            from app.config import get_settings
-            
-            settings = get_settings()
-            db = SessionLocal()
-            
-            # Get monthly entries
-            entries = TimesheetService.get_monthly_entries(db)
-            blocks = BlockBuilder.build_report_blocks(
-                entries,
-                "📊 Monthly Timesheet Summary"
-            )
-            
-            # Send to manager
-            self.slack_service.send_dm(
-                settings.slack_manager_user_id,
-                blocks,
-                "Monthly Timesheet Summary"
-            )
-            
+            return func(db, *args)
+        finally:
             db.close()
-            logger.info("Monthly summary sent to manager")
+    
+    @staticmethod
+    def _instrument(job_id: str, job: Job) -> Job:
+        async def run():
+            started_at = time.perf_counter()
+            status = 'success'
+            try:
+                await job()
+            except Exception:
+                status = 'error'
+                raise
+            finally:
+                JOB_DURATION.labels(job_id).observe(time.perf_counter() - started_at)
+                JOB_LAST_RUN.labels(job_id, status).set_to_current_time()
+        return run
+    
+    async def stop(self):
+        if self._election_task is not None:
+            self._election_task.cancel()
+            await asyncio.gather(self._election_task, return_exceptions=True)
+            self._election_task = None
+        if self._lock_op is not None:
+            await asyncio.gather(self._lock_op, return_exceptions=True)
+            self._lock_op = None
+        self.scheduler.shutdown()
+        # Let another process take over right away instead of after a poll interval
+        await asyncio.to_thread(self._release_lock)
+        self.is_leader = False
+        self._lock_engine.dispose()
+        logger.info("Scheduler stopped")
+    
+    async def send_weekly_reminder(self):
+        # Failures propagate so _run_once records the run as an error
+        count = await asyncio.to_thread(self._with_session, self._queue_weekly_reminder)
+        logger.info(f"Weekly reminder queued for {count} channels")
+    
+    @staticmethod
+    def _queue_weekly_reminder(db) -> int:
+        # Get all channels where bot is present
+        channels = ChannelService.get_active_channel_ids(db)
         
-        except Exception as e:
-            logger.error(f"Error sending monthly summary: {str(e)}")
\ No newline at end of file
+        reminder_blocks = [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "⏰ *Weekly Timesheet Reminder*\n\nDon't forget to fill your timesheet for this week!\nUse `/timesheet` command to submit."
+                }
+            },
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "Fill Timesheet"},
+                        "action_id": "open_timesheet_modal",
+                        "style": "primary"
+                    }
+                ]
+            }
+        ]
+        
+        # Queued durably; the outbox drainer delivers and retries them
+        OutboxService.enqueue(db, [
+            OutboxService.message('post', channel, reminder_blocks, "Time to fill your timesheet!")
+            for channel in channels
+        ])
+        return len(channels)
+    
+    async def send_monthly_summary(self):
+        await asyncio.to_thread(self._with_session, self._queue_monthly_summary)
+        logger.info("Monthly summary queued for manager")
+    
+    @staticmethod
+    def _queue_monthly_summary(db):
+        from app.services.report_service import ReportService
+        
+        # First page of the month; the rest is reachable with the paging buttons
+        blocks = ReportService.render_page(db, 'monthly')
+        
+        # Send to manager through the outbox
+        OutboxService.enqueue(db, [
+            OutboxService.message('dm', settings.slack_manager_user_id, blocks, "Monthly Timesheet Summary")
+        ])
+    
+    async def maintain_partitions(self):
+        created = await asyncio.to_thread(
+            self._with_session, PartitionService.premake, settings.partition_premake_months
+        )
+        logger.info(f"Partition maintenance created {len(created)} partitions")
+        
+        if settings.partition_retention_months > 0:
+            archived = await asyncio.to_thread(
+                self._with_session,
+                PartitionService.archive_expired,
+                settings.partition_retention_months,
+                Path(settings.partition_archive_dir)
+            )
+            logger.info(f"Partition maintenance archived {len(archived)} partitions")
@@ -0,0 +1,35 @@
+from app.config import get_settings
+from typing import Dict, Optional
+from urllib.parse import urlencode
+import hashlib
+import hmac
+import time
+
+settings = get_settings()
+
+
+def _signature(user: str, exp: str) -> str:
+    # Only the grantee and expiry are signed, so filters can be adjusted on the link
+    secret = (settings.export_signing_secret or settings.slack_signing_secret).encode()
+    return hmac.new(secret, f"{user}:{exp}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign_url(path: str, user: str, params: Dict[str, Optional[str]], ttl: int) -> str:
+    query = {key: str(value) for key, value in params.items() if value is not None}
+    query['user'] = user
+    query['exp'] = str(int(time.time()) + ttl)
+    query['sig'] = _signature(user, query['exp'])
+    return f"{settings.public_base_url.rstrip('/')}{path}?{urlencode(query)}"
+
+
+def verify_signed_params(params: Dict[str, str]) -> Optional[str]:
+    user = params.get('user', '')
+    exp = params.get('exp', '')
+    try:
+        if int(exp) < time.time():
+            return None
+    except ValueError:
+        return None
+    if not hmac.compare_digest(_signature(user, exp), params.get('sig', '')):
+        return None
+    return user
@@ -0,0 +1,64 @@
+from fastapi import HTTPException, Request
+from app.config import get_settings
+from typing import Any, Dict
+from urllib.parse import parse_qsl
+import hashlib
+import hmac
+import orjson
+import time
+
+settings = get_settings()
+
+# Encoded once instead of on every request
+_SIGNING_KEY = settings.slack_signing_secret.encode()
+MAX_REQUEST_AGE = 60 * 5
+
+
+def verify_slack_signature(timestamp: bytes, signature: bytes, body: bytes) -> bool:
+    try:
+        request_time = int(timestamp)
+    except ValueError:
+        return False
+    
+    # Prevent replay attacks
+    if abs(time.time() - request_time) > MAX_REQUEST_AGE:
+        return False
+    
+    # HMAC over the raw bytes, no decode/re-encode of the body
+    expected = b"v0=" + hmac.new(
+        _SIGNING_KEY,
+        b"v0:" + timestamp + b":" + body,
+        hashlib.sha256
+    ).hexdigest().encode()
+    
+    return hmac.compare_digest(expected, signature)
+
+
+def _parse_body(content_type: str, body: bytes) -> Dict[str, Any]:
+    if content_type.startswith("application/json"):
+        return orjson.loads(body) if body else {}
+    
+    # Slash commands and interactions are form-encoded; interactions wrap JSON in "payload"
+    form = dict(parse_qsl(body.decode(), keep_blank_values=True))
+    if "payload" in form:
+        return orjson.loads(form["payload"])
+    return form
+
+
+async def get_slack_payload(request: Request) -> Dict[str, Any]:
+    # Reads the body once, verifies it and parses it once. Used as a router-wide
+    # dependency, so routes asking for it get the cached result of the same call.
+    body = await request.body()
+    headers = request.headers
+    
+    if not verify_slack_signature(
+        headers.get("X-Slack-Request-Timestamp", "").encode("latin-1"),
+        headers.get("X-Slack-Signature", "").encode("latin-1"),
+        body
+    ):
+        raise HTTPException(status_code=403, detail="Invalid signature")
+    
+    try:
+        return _parse_body(headers.get("Content-Type", ""), body)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Malformed payload")
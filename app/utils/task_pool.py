@@ -0,0 +1,118 @@
+from fastapi import Request
+from app.utils.metrics import TASK_QUEUE_WAIT, TASK_DURATION
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class BackgroundTaskPool:
+    def __init__(self, workers: int, max_queue_size: int, sample_size: int = 1000):
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._wait_times: Deque[float] = deque(maxlen=sample_size)
+        self._run_times: Deque[float] = deque(maxlen=sample_size)
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.in_flight = 0
+    
+    async def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"task-pool-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Background task pool started with {self.workers} workers")
+    
+    async def stop(self, timeout: float = 10.0):
+        if self._queue is None:
+            return
+        
+        # Give queued work a chance to finish before cancelling the workers
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Background task pool stopped with {self._queue.qsize()} queued tasks")
+        
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        logger.info("Background task pool stopped")
+    
+    def submit(self, func: Callable[..., Awaitable[Any]], *args: Any) -> bool:
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait((func, args, time.monotonic()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning("Background task pool queue is full, task rejected")
+            return False
+        self.submitted += 1
+        return True
+    
+    async def _worker(self, worker_id: int):
+        while True:
+            func, args, enqueued_at = await self._queue.get()
+            started_at = time.monotonic()
+            self._wait_times.append(started_at - enqueued_at)
+            TASK_QUEUE_WAIT.observe(started_at - enqueued_at)
+            self.in_flight += 1
+            try:
+                await func(*args)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background task {getattr(func, '__name__', func)} failed: {str(e)}", exc_info=True)
+            finally:
+                self.in_flight -= 1
+                self._run_times.append(time.monotonic() - started_at)
+                TASK_DURATION.observe(time.monotonic() - started_at)
+                self._queue.task_done()
+    
+    def stats(self) -> Dict[str, Any]:
+        wait_times = list(self._wait_times)
+        run_times = list(self._run_times)
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self.in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_wait_seconds": {
+                "p50": _percentile(wait_times, 50),
+                "p95": _percentile(wait_times, 95),
+                "max": max(wait_times, default=0.0)
+            },
+            "task_latency_seconds": {
+                "p50": _percentile(run_times, 50),
+                "p95": _percentile(run_times, 95),
+                "max": max(run_times, default=0.0)
+            }
+        }
+
+
+def get_task_pool(request: Request) -> BackgroundTaskPool:
+    return request.app.state.task_pool
@@ -0,0 +1,188 @@
+"""Micro-benchmarks for the pure-Python hot spots, with stored baselines.
+
+    python -m benchmarks.bench_hotspots [--filter report] [--repeat 5]
+    python -m benchmarks.bench_hotspots --save [--baseline benchmarks/baselines/baseline.json]
+    python -m benchmarks.bench_hotspots --compare [--baseline ...] [--threshold 10]
+    python -m benchmarks.bench_hotspots --smoke
+
+Each case is timed with timeit (enough loops for ~0.2s, best of --repeat) and
+reported per call:
+
+    entry_forms(n)      BlockBuilder.build_entry_forms, n = 1..5
+    report_blocks(n)    BlockBuilder.build_report_blocks over n entry dicts
+    entry_to_dict(n)    TimesheetService.entry_to_dict (and its strftime) over n rows,
+                        the conversion get_weekly_entries / get_monthly_entries do
+    verify_signature(n) verify_slack_signature on an n-byte body
+
+--save writes the results to --baseline. --compare reads it back and exits with
+status 1 if any case is still more than --threshold percent slower after being
+measured up to three times. --save keeps the faster of two measurements.
+
+Numbers only mean something against a baseline recorded on the same machine and
+Python version. The committed baselines/baseline.json records where it was taken;
+re-record it with --save when the reference machine changes. CI doesn't use it:
+on pull requests it records a baseline from the base commit on the same runner
+and compares the head against that. --smoke calls every case once without timing
+it, so a broken benchmark fails the build.
+"""
+from app.utils.block_builder import BlockBuilder, MAX_ENTRY_FORMS
+from app.services.timesheet_service import TimesheetService
+from app.utils.slack_request import verify_slack_signature
+from app.config import get_settings
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import hashlib
+import hmac
+import json
+import platform
+import sys
+import time
+import timeit
+
+settings = get_settings()
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+REPORT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+ROW_SIZES = (10, 1_000, 100_000)
+# A slash command, an interaction with a few entries, a large block_actions payload
+BODY_SIZES = (512, 4_096, 32_768)
+
+
+def _rows(n: int) -> List[Any]:
+    # Attribute access like the Row objects the queries return
+    start = datetime(2026, 1, 5, 9, 0)
+    return [
+        SimpleNamespace(
+            username=f"user{i % 200}",
+            client_name=f"client{i % 50}",
+            hours=float(i % 8 + 1),
+            proof_url=f"https://files.slack.com/files-pri/T0-F{i}/proof.pdf" if i % 3 == 0 else None,
+            submission_date=start + timedelta(minutes=i)
+        )
+        for i in range(n)
+    ]
+
+
+def _signed_body(size: int) -> Tuple[bytes, bytes, bytes]:
+    body = (b"payload=" + b"x" * size)[:size]
+    timestamp = str(int(time.time())).encode()
+    signature = b"v0=" + hmac.new(
+        settings.slack_signing_secret.encode(),
+        b"v0:" + timestamp + b":" + body,
+        hashlib.sha256
+    ).hexdigest().encode()
+    return timestamp, signature, body
+
+
+def _cases() -> List[Tuple[str, Callable[[], Callable[[], Any]]]]:
+    # Each case is (name, setup); setup runs once, right before timing, and returns the
+    # callable to time, so large inputs are only built for the cases selected
+    cases = []
+    for n in range(1, MAX_ENTRY_FORMS + 1):
+        cases.append((f"entry_forms({n})", lambda n=n: lambda: BlockBuilder.build_entry_forms(n)))
+
+    def report_setup(n):
+        entries = [TimesheetService.entry_to_dict(row) for row in _rows(n)]
+        return lambda: BlockBuilder.build_report_blocks(entries, "📊 Weekly Timesheet Report")
+
+    for n in REPORT_SIZES:
+        cases.append((f"report_blocks({n})", lambda n=n: report_setup(n)))
+
+    def rows_setup(n):
+        rows = _rows(n)
+        return lambda: [TimesheetService.entry_to_dict(row) for row in rows]
+
+    for n in ROW_SIZES:
+        cases.append((f"entry_to_dict({n})", lambda n=n: rows_setup(n)))
+
+    def signature_setup(n):
+        # Signed just before timing so the request stays inside the replay window
+        timestamp, signature, body = _signed_body(n)
+        assert verify_slack_signature(timestamp, signature, body)
+        return lambda: verify_slack_signature(timestamp, signature, body)
+
+    for n in BODY_SIZES:
+        cases.append((f"verify_signature({n})", lambda n=n: signature_setup(n)))
+    return cases
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _format(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per case; the best is kept")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file to save or compare against")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="Store the results as the baseline")
+    mode.add_argument("--compare", action="store_true", help="Fail if any case is slower than the baseline")
+    mode.add_argument("--smoke", action="store_true", help="Run every case once without timing, to check they still work")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent for --compare")
+    args = parser.parse_args()
+
+    if args.smoke:
+        for name, setup in _cases():
+            if args.filter in name:
+                setup()()
+                print(f"{name:<24}ok")
+        return
+
+    baseline: Dict[str, float] = {}
+    if args.compare:
+        if not args.baseline.exists():
+            parser.error(f"No baseline at {args.baseline}; record one with --save first")
+        baseline = json.loads(args.baseline.read_text())['results']
+
+    results: Dict[str, float] = {}
+    regressions = []
+    print(f"{'case':<24}{'per call':>14}{'baseline':>14}{'change':>10}")
+    for name, setup in _cases():
+        if args.filter not in name:
+            continue
+        func = setup()
+        results[name] = _measure(func, args.repeat)
+        # Measure again before recording a baseline or calling a regression; a noisy
+        # neighbour tends to slow one round, not all of them
+        retries = 1 if args.save else 2
+        while retries and (args.save or results[name] > baseline.get(name, float('inf')) * (1 + args.threshold / 100)):
+            results[name] = min(results[name], _measure(func, args.repeat))
+            retries -= 1
+
+        line = f"{name:<24}{_format(results[name]):>14}"
+        if name in baseline:
+            change = (results[name] / baseline[name] - 1) * 100
+            regressed = change > args.threshold
+            regressions += [name] if regressed else []
+            line += f"{_format(baseline[name]):>14}{change:>+9.1f}%{'  SLOWER' if regressed else ''}"
+        print(line)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'results': results
+        }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) more than {args.threshold:g}% slower than {args.baseline}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Per-request cost of producing the /timesheet and "Continue" response bodies.
+
+    python -m benchmarks.bench_serialization [--number N]
+
+"before" rebuilds the blocks and encodes them the way Starlette's JSONResponse
+does; "orjson" rebuilds them and encodes with orjson; "precomputed" returns the
+bytes BlockBuilder.precompute() prepared at startup.
+"""
+from app.utils.block_builder import BlockBuilder, MAX_ENTRY_FORMS
+import argparse
+import json
+import orjson
+import timeit
+
+
+def _stdlib_render(content):
+    # Same settings as starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _initial_payload():
+    return {"response_type": "ephemeral", "blocks": BlockBuilder.build_initial_form(), "text": "Fill your timesheet"}
+
+
+def _entry_payload(num_entries):
+    return {"blocks": BlockBuilder.build_entry_forms(num_entries), "replace_original": "true", "response_type": "ephemeral"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Iterations per case")
+    args = parser.parse_args()
+    
+    BlockBuilder.precompute()
+    cases = [("initial_form", _initial_payload, BlockBuilder.initial_form_response)]
+    for n in range(1, MAX_ENTRY_FORMS + 1):
+        cases.append((
+            f"entry_forms({n})",
+            lambda n=n: _entry_payload(n),
+            lambda n=n: BlockBuilder.entry_forms_response(n)
+        ))
+    
+    print(f"{'case':<16}{'before (us)':>14}{'orjson (us)':>14}{'precomputed (us)':>19}{'speedup':>10}")
+    for name, build, precomputed in cases:
+        assert orjson.loads(precomputed()) == json.loads(_stdlib_render(build()))
+        before = timeit.timeit(lambda: _stdlib_render(build()), number=args.number) / args.number * 1e6
+        fast = timeit.timeit(lambda: orjson.dumps(build()), number=args.number) / args.number * 1e6
+        cached = timeit.timeit(precomputed, number=args.number) / args.number * 1e6
+        print(f"{name:<16}{before:>14.2f}{fast:>14.2f}{cached:>19.3f}{before / cached:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Local stand-in for the Slack Web API, for load tests.
+
+    python -m benchmarks.fake_slack [--port 8090] [--latency-ms 50] [--jitter-ms 20] [--ratelimit 0.01]
+
+Point the bot at it with SLACK_API_BASE_URL=http://localhost:8090/api/. It answers
+chat.postMessage, chat.update, conversations.open, conversations.members,
+files.info, users.info and users.list, plus response_url posts under /response/.
+Every call waits latency +/- jitter; a --ratelimit fraction of calls get HTTP 429
+with Retry-After. GET /_stats returns per-method counts and the receipt time and
+channel of every chat.postMessage; POST /_reset clears them.
+"""
+from aiohttp import web
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+HANDLED = ('chat.postMessage', 'chat.update', 'conversations.open', 'conversations.members', 'files.info', 'users.info', 'users.list')
+
+
+class FakeSlack:
+    def __init__(self, latency_ms: float, jitter_ms: float, ratelimit: float, retry_after: int, users: int):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.ratelimit = ratelimit
+        self.retry_after = retry_after
+        self.users = users
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self.posts: List[Tuple[float, str]] = []
+        self._ts = itertools.count(1)
+
+    async def _delay(self):
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    @staticmethod
+    async def _params(request: web.Request) -> Dict[str, Any]:
+        # slack_sdk sends some methods as JSON, others as form fields or query strings
+        params: Dict[str, Any] = dict(request.query)
+        if request.method == 'POST' and request.can_read_body:
+            if request.content_type == 'application/json':
+                params.update(await request.json())
+            else:
+                params.update(await request.post())
+        return params
+
+    def _user(self, user_id: str) -> Dict[str, Any]:
+        return {
+            'id': user_id,
+            'name': user_id.lower(),
+            'profile': {'display_name': f"Load {user_id}", 'real_name': f"Load Test {user_id}"}
+        }
+
+    async def api(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        params = await self._params(request)
+        await self._delay()
+        self.calls[method] += 1
+
+        if method not in HANDLED:
+            return web.json_response({'ok': False, 'error': 'unknown_method'})
+        if random.random() < self.ratelimit:
+            self.rate_limited[method] += 1
+            return web.json_response(
+                {'ok': False, 'error': 'ratelimited'},
+                status=429,
+                headers={'Retry-After': str(self.retry_after)}
+            )
+
+        ts = f"{int(time.time())}.{next(self._ts):06d}"
+        if method == 'chat.postMessage':
+            self.posts.append((time.time(), str(params.get('channel'))))
+            return web.json_response({'ok': True, 'channel': params.get('channel'), 'ts': ts, 'message': {}})
+        if method == 'chat.update':
+            return web.json_response({'ok': True, 'channel': params.get('channel'), 'ts': params.get('ts')})
+        if method == 'conversations.open':
+            return web.json_response({'ok': True, 'channel': {'id': 'D' + str(params.get('users', 'U0'))}})
+        if method == 'conversations.members':
+            return web.json_response({'ok': True, 'members': [f"U{i}" for i in range(min(self.users, 100))]})
+        if method == 'files.info':
+            file_id = params.get('file', 'F0')
+            return web.json_response({'ok': True, 'file': {'id': file_id, 'url_private': f"https://files.example/{file_id}"}})
+        if method == 'users.info':
+            return web.json_response({'ok': True, 'user': self._user(str(params.get('user', 'U0')))})
+
+        # users.list, 200 per page
+        offset = int(params.get('cursor') or 0)
+        limit = int(params.get('limit') or 200)
+        members = [self._user(f"U{i}") for i in range(offset, min(offset + limit, self.users))]
+        next_cursor = str(offset + limit) if offset + limit < self.users else ''
+        return web.json_response({'ok': True, 'members': members, 'response_metadata': {'next_cursor': next_cursor}})
+
+    async def response_url(self, request: web.Request) -> web.Response:
+        await request.read()
+        await self._delay()
+        self.calls['response_url'] += 1
+        return web.Response(text='ok')
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'calls': dict(self.calls),
+            'rate_limited': dict(self.rate_limited),
+            'posts': self.posts
+        })
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.calls.clear()
+        self.rate_limited.clear()
+        self.posts = []
+        return web.json_response({'ok': True})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/api/{method}', self.api)
+        app.router.add_post('/response/{id}', self.response_url)
+        app.router.add_get('/_stats', self.stats)
+        app.router.add_post('/_reset', self.reset)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean response delay per call")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Uniform +/- variation on the delay")
+    parser.add_argument("--ratelimit", type=float, default=0.0, help="Fraction of calls answered with HTTP 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429 responses")
+    parser.add_argument("--users", type=int, default=200, help="Workspace size reported by users.list")
+    args = parser.parse_args()
+
+    fake = FakeSlack(args.latency_ms, args.jitter_ms, args.ratelimit, args.retry_after, args.users)
+    print(json.dumps(vars(args)))
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
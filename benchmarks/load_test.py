@@ -0,0 +1,277 @@
+"""End-to-end load test of the running bot against the fake Slack API.
+
+    python -m benchmarks.fake_slack --latency-ms 50 &
+    SLACK_API_BASE_URL=http://127.0.0.1:8090/api/ uvicorn app.main:app &
+    python -m benchmarks.load_test seed [--rows 200000] [--channels 100]
+    python -m benchmarks.load_test run [--rate 50] [--duration 30] [--mix submit=6,report=1,form=3] [--reminder]
+
+"seed" fills the configured Postgres database with historical entries, rollups and
+active channels. "run" fires signed Slack requests at --target at a fixed rate
+(open loop: a slow response does not delay the next request, and latency is
+measured from when the request was due) and prints throughput and p50/p95/p99 per
+scenario:
+
+    submit  /slack/interactions, a submit_timesheet action with a fresh form each time
+    report  /slack/commands/timesheet-weekly as the manager
+    form    /slack/commands/timesheet
+
+--reminder then queues the weekly reminder the way the scheduler does and reports,
+per active channel, the delay until its chat.postMessage reaches the fake API.
+The bot's outbox drainer does the delivering, so the reminder figures include its
+polling interval and any 429 backoff.
+
+Postgres only: the bot relies on ON CONFLICT, range partitions, advisory locks and
+COPY, none of which SQLite provides.
+"""
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.config import get_settings
+from app.database import SessionLocal, init_db
+from app.models.channel import Channel
+from app.services.partition_service import PartitionService
+from app.services.channel_service import ChannelService
+from app.tools.explain_check import SEED_ENTRIES_SQL, SEED_ROLLUPS_SQL
+from app.utils.scheduler import TaskScheduler
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+import argparse
+import asyncio
+import hashlib
+import hmac
+import httpx
+import itertools
+import json
+import random
+import time
+
+settings = get_settings()
+
+SCENARIOS = ('submit', 'report', 'form')
+
+
+def _signed(body: bytes) -> Dict[str, str]:
+    # Same scheme verify_slack_signature checks
+    timestamp = str(int(time.time()))
+    digest = hmac.new(
+        settings.slack_signing_secret.encode(),
+        b"v0:" + timestamp.encode() + b":" + body,
+        hashlib.sha256
+    ).hexdigest()
+    return {
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'X-Slack-Request-Timestamp': timestamp,
+        'X-Slack-Signature': f"v0={digest}",
+    }
+
+
+def _submit_request(n: int, fake_url: str) -> Tuple[str, bytes]:
+    entries = random.randint(1, 3)
+    values = {}
+    for i in range(entries):
+        values[f'client_block_{i}'] = {f'client_input_{i}': {'type': 'plain_text_input', 'value': f"client{random.randrange(50)}"}}
+        values[f'hours_block_{i}'] = {f'hours_input_{i}': {'type': 'plain_text_input', 'value': str(random.randint(1, 8))}}
+    user_id = f"U{random.randrange(200)}"
+    # A distinct form message per request, so each one is a new submission rather than a replay
+    form_ts = f"{time.time():.6f}{n}"
+    payload = {
+        'type': 'block_actions',
+        'user': {'id': user_id, 'username': user_id.lower(), 'name': user_id.lower()},
+        'channel': {'id': f"C{random.randrange(100)}"},
+        'container': {'type': 'message', 'message_ts': form_ts},
+        'message': {'ts': form_ts},
+        'trigger_id': f"load.{n}",
+        'response_url': f"{fake_url}/response/{n}",
+        'actions': [{'action_id': 'submit_timesheet', 'action_ts': form_ts}],
+        'state': {'values': values},
+    }
+    return '/slack/interactions', urlencode({'payload': json.dumps(payload)}).encode()
+
+
+def _command_request(path: str, command: str, user_id: str, n: int, fake_url: str) -> Tuple[str, bytes]:
+    return path, urlencode({
+        'command': command,
+        'text': '',
+        'user_id': user_id,
+        'user_name': user_id.lower(),
+        'channel_id': 'C0',
+        'trigger_id': f"load.{n}",
+        'response_url': f"{fake_url}/response/{n}",
+    }).encode()
+
+
+def _build_request(scenario: str, n: int, fake_url: str) -> Tuple[str, bytes]:
+    if scenario == 'submit':
+        return _submit_request(n, fake_url)
+    if scenario == 'report':
+        return _command_request('/slack/commands/timesheet-weekly', '/timesheet-weekly', settings.slack_manager_user_id, n, fake_url)
+    return _command_request('/slack/commands/timesheet', '/timesheet', f"U{random.randrange(200)}", n, fake_url)
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _report(name: str, latencies: List[float], errors: int, elapsed: float):
+    if not latencies:
+        print(f"{name:<10}{0:>8}{errors:>8}")
+        return
+    ms = [latency * 1000 for latency in latencies]
+    print(
+        f"{name:<10}{len(ms):>8}{errors:>8}{len(ms) / elapsed:>10.1f}"
+        f"{_percentile(ms, 50):>10.1f}{_percentile(ms, 95):>10.1f}{_percentile(ms, 99):>10.1f}"
+    )
+
+
+def _header():
+    print(f"{'scenario':<10}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+
+async def _drive(args) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    total = int(args.rate * args.duration)
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def fire(client: httpx.AsyncClient, scenario: str, n: int, due: float):
+        path, body = _build_request(scenario, n, args.fake)
+        async with limit:
+            try:
+                response = await client.post(path, content=body, headers=_signed(body))
+                failed = response.status_code != 200 or (
+                    scenario == 'submit' and b'"errors"' in response.content
+                )
+            except httpx.HTTPError:
+                failed = True
+        # From when the request was due, so queueing behind the cap counts against the bot
+        latencies[scenario].append(time.monotonic() - due)
+        errors[scenario] += failed
+
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.timeout, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        tasks = []
+        started = time.monotonic()
+        for n in range(total):
+            due = started + n / args.rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scenario = random.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(fire(client, scenario, n, due)))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+    return latencies, errors, elapsed
+
+
+async def _reminder(args) -> Tuple[List[float], int, float]:
+    db = SessionLocal()
+    try:
+        channels = set(ChannelService.get_active_channel_ids(db))
+    finally:
+        db.close()
+
+    async with httpx.AsyncClient(base_url=args.fake, timeout=args.timeout) as fake:
+        await fake.post('/_reset')
+        queued_at = time.time()
+        # Queue only; delivery is left to the running bot's outbox drainer
+        await TaskScheduler(None).send_weekly_reminder()
+
+        delivered: Dict[str, float] = {}
+        deadline = time.monotonic() + args.reminder_timeout
+        while len(delivered) < len(channels) and time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            stats = (await fake.get('/_stats')).json()
+            for received_at, channel in stats['posts']:
+                if channel in channels:
+                    delivered.setdefault(channel, received_at)
+
+    delays = [received_at - queued_at for received_at in delivered.values()]
+    elapsed = max(delays, default=0.0) or 1e-9
+    return delays, len(channels) - len(delivered), elapsed
+
+
+def seed(args):
+    init_db()
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        print(f"Seeding {args.rows} entries over {args.days} days and {args.channels} channels")
+        PartitionService.ensure_partitions(db, (now - timedelta(days=args.days + 1)).date(), now.date())
+        db.execute(text(SEED_ENTRIES_SQL), {
+            'rows': args.rows, 'days': args.days, 'users': 200, 'channels': args.channels, 'clients': 50
+        })
+        db.execute(text(SEED_ROLLUPS_SQL))
+        db.execute(
+            pg_insert(Channel)
+            .values([
+                {'channel_id': f"C{i}", 'is_active': True, 'is_archived': False, 'created_at': now, 'updated_at': now}
+                for i in range(args.channels)
+            ])
+            .on_conflict_do_update(index_elements=['channel_id'], set_={'is_active': True, 'updated_at': now})
+        )
+        db.commit()
+        db.execute(text("ANALYZE timesheet_entries"))
+        db.execute(text("ANALYZE timesheet_daily_rollups"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(args):
+    print(f"{args.rate:g} req/s for {args.duration:g}s against {args.target}, mix {args.mix}")
+    latencies, errors, elapsed = asyncio.run(_drive(args))
+    _header()
+    for scenario in SCENARIOS:
+        if scenario in args.mix:
+            _report(scenario, latencies[scenario], errors[scenario], elapsed)
+    all_latencies = list(itertools.chain.from_iterable(latencies.values()))
+    _report('total', all_latencies, sum(errors.values()), elapsed)
+
+    if args.reminder:
+        delays, missing, elapsed = asyncio.run(_reminder(args))
+        # Throughput here is channels delivered per second until the last one arrived
+        _report('reminder', delays, missing, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help="Fill the database with historical entries and active channels")
+    seed_parser.add_argument("--rows", type=int, default=200_000, help="Entries to seed")
+    seed_parser.add_argument("--days", type=int, default=365, help="Spread seeded entries over this many days")
+    seed_parser.add_argument("--channels", type=int, default=100, help="Active channels to register")
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = commands.add_parser('run', help="Drive signed Slack traffic at the bot")
+    run_parser.add_argument("--target", default="http://127.0.0.1:8000", help="Base URL of the bot")
+    run_parser.add_argument("--fake", default="http://127.0.0.1:8090", help="Base URL of benchmarks.fake_slack")
+    run_parser.add_argument("--rate", type=float, default=50.0, help="Requests per second")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic")
+    run_parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("submit=6,report=1,form=3"), help="Scenario weights")
+    run_parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at most")
+    run_parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    run_parser.add_argument("--reminder", action="store_true", help="Also measure weekly reminder delivery")
+    run_parser.add_argument("--reminder-timeout", type=float, default=120.0, help="Give up waiting for reminders after this many seconds")
+    run_parser.set_defaults(func=run)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()